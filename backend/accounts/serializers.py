@@ -2,7 +2,6 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from .models import Profile
-from .utils import send_verification_email
 
 
 # ------------------------------
@@ -46,9 +45,6 @@ class RegisterSerializer(serializers.ModelSerializer):
             is_verified=False  # verification required
         )
 
-        # Send verification email
-        send_verification_email(user)
-
         return user
 
 
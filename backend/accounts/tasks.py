@@ -0,0 +1,40 @@
+from celery import shared_task
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from .utils import build_account_email, dedupe_key
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Retried after 1, 2, 4, 8, 16 minutes before giving up
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 60
+
+
+@shared_task(bind=True, max_retries=MAX_RETRIES, rate_limit="30/m", acks_late=True)
+def send_account_email(self, kind, user_id):
+    """
+    Sends one verification or password reset mail (see accounts.utils).
+    The rate limit keeps a signup burst within the SMTP provider's limits.
+    """
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or not user.email:
+        return False
+    # Verified in the meantime, e.g. through an earlier mail
+    if kind == "verify" and user.is_active:
+        return False
+
+    try:
+        build_account_email(kind, user).send()
+    except Exception as e:
+        if self.request.retries >= MAX_RETRIES:
+            logger.error(f"MAIL ERROR: giving up on {kind} mail for user {user_id}: {e}")
+            # Let the user ask for a new mail straight away
+            try:
+                cache.delete(dedupe_key(kind, user_id))
+            except Exception:
+                pass
+            return False
+        logger.warning(f"MAIL ERROR: {kind} mail for user {user_id}: {e}")
+        raise self.retry(exc=e, countdown=RETRY_BASE_DELAY * 2 ** self.request.retries)
+    return True
@@ -1,3 +1,92 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import tasks, utils
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QueueAccountEmailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw")
+        patcher = mock.patch.object(tasks.send_account_email, "delay")
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeats_within_the_window_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(utils.queue_account_email("reset", self.user))
+            self.assertFalse(utils.queue_account_email("reset", self.user))
+            # Each kind has its own window
+            self.assertTrue(utils.queue_account_email("verify", self.user))
+
+        self.assertEqual(self.delay.call_args_list, [mock.call("reset", self.user.pk), mock.call("verify", self.user.pk)])
+
+    def test_window_expiry_allows_a_new_mail(self):
+        utils.queue_account_email("reset", self.user)
+        cache.delete(utils.dedupe_key("reset", self.user.pk))
+
+        self.assertTrue(utils.queue_account_email("reset", self.user))
+
+    def test_mail_is_queued_only_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            utils.queue_account_email("reset", self.user)
+            self.delay.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+
+    def test_cache_outage_still_queues_the_mail(self):
+        with mock.patch.object(utils.cache, "add", side_effect=ConnectionError("no cache")):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = APIClient().post("/api/forgot-password/", {"email": "alice@example.com"}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.delay.assert_called_once_with("reset", self.user.pk)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class SendAccountEmailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw")
+
+    def send(self, side_effect):
+        message = mock.Mock(**{"send.side_effect": side_effect})
+        with mock.patch.object(tasks, "build_account_email", return_value=message):
+            result = tasks.send_account_email.apply(args=("reset", self.user.pk)).get()
+        return result, message.send.call_count
+
+    def test_sends_the_reset_link(self):
+        self.assertTrue(tasks.send_account_email.apply(args=("reset", self.user.pk)).get())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("/reset-password/", mail.outbox[0].body)
+
+    def test_transient_failures_are_retried(self):
+        self.assertEqual(self.send([ConnectionError("smtp down"), ConnectionError("smtp down"), 1]), (True, 3))
+
+    def test_gives_up_after_max_retries_and_clears_the_window(self):
+        cache.set(utils.dedupe_key("reset", self.user.pk), 1)
+
+        self.assertEqual(self.send(ConnectionError("smtp down")), (False, tasks.MAX_RETRIES + 1))
+        self.assertIsNone(cache.get(utils.dedupe_key("reset", self.user.pk)))
+
+    def test_backoff_doubles(self):
+        with mock.patch.object(tasks.send_account_email, "retry", side_effect=RuntimeError) as retry, \
+                mock.patch.object(tasks, "build_account_email") as build:
+            build.return_value.send.side_effect = ConnectionError("smtp down")
+            for retries in range(3):
+                with self.assertRaises(RuntimeError):
+                    tasks.send_account_email.apply(args=("reset", self.user.pk), retries=retries).get()
+                self.assertEqual(retry.call_args.kwargs["countdown"], tasks.RETRY_BASE_DELAY * 2 ** retries)
+
+    def test_skips_verified_users(self):
+        self.assertFalse(tasks.send_account_email.apply(args=("verify", self.user.pk)).get())
+        self.assertEqual(len(mail.outbox), 0)
@@ -1,45 +1,74 @@
+from django.core.cache import cache
 from django.core.mail import EmailMessage
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.conf import settings
-import threading
+import logging
 
+logger = logging.getLogger(__name__)
 
-def _async_send(email):
-    """Send email in a separate thread so it doesn't slow API."""
-    try:
-        email.send()
-    except Exception as e:
-        print("Email sending error:", e)
+FRONTEND_URL = "http://localhost:5173"
 
+# A second request for the same mail within this window is dropped
+EMAIL_DEDUPE_WINDOW = 60
+EMAIL_DEDUPE_KEY_PREFIX = "accounts:email:"
 
-def send_verification_email(user):
-    """
-    Sends email verification link to user's email (FAST, non-blocking)
-    """
-    uid = urlsafe_base64_encode(force_bytes(user.pk))
-    token = default_token_generator.make_token(user)
+# Mail kind -> (subject, frontend path, body)
+ACCOUNT_EMAILS = {
+    "verify": (
+        "Verify your Investo account",
+        "verify-email",
+        "Hi {username},\n\nPlease click the link below to verify your email:\n\n{link}\n\n"
+        "If you did not create this account, ignore this email.",
+    ),
+    "reset": (
+        "Reset your Investo password",
+        "reset-password",
+        "Hi {username},\n\nClick the link to reset your password:\n\n{link}\n\n"
+        "If you did not ask for a reset, ignore this email.",
+    ),
+}
+
+
+def dedupe_key(kind, user_id):
+    return f"{EMAIL_DEDUPE_KEY_PREFIX}{kind}:{user_id}"
 
-    verification_link = f"http://localhost:5173/verify-email/{uid}/{token}/"
 
-    mail_subject = "Verify your Investo account"
-    message = f"""
-    Hi {user.username},
+def build_account_email(kind, user):
+    """Builds a verification or password-reset mail with a fresh token link."""
+    subject, path, body = ACCOUNT_EMAILS[kind]
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    link = f"{FRONTEND_URL}/{path}/{uid}/{token}/"
 
-    Please click the link below to verify your email:
+    return EmailMessage(
+        subject=subject,
+        body=body.format(username=user.username, link=link),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
 
-    {verification_link}
 
-    If you did not create this account, ignore this email.
+def queue_account_email(kind, user):
     """
+    Queues a verification ("verify") or password reset ("reset") mail on
+    Celery once the current transaction commits, so the request never waits
+    on SMTP. Repeats within EMAIL_DEDUPE_WINDOW are dropped; if the cache
+    is down every request is queued. Returns False if the mail was deduplicated.
+    """
+    from .tasks import send_account_email
 
-    email = EmailMessage(
-        subject=mail_subject,
-        body=message,
-        from_email=settings.EMAIL_HOST_USER,
-        to=[user.email]
-    )
+    try:
+        if not cache.add(dedupe_key(kind, user.pk), 1, EMAIL_DEDUPE_WINDOW):
+            return False
+    except Exception as e:
+        logger.warning(f"Email dedupe unavailable, queueing anyway: {e}")
+    transaction.on_commit(lambda: send_account_email.delay(kind, user.pk))
+    return True
 
-    #  Send asynchronously to avoid 3–5 sec delay
-    threading.Thread(target=_async_send, args=(email,)).start()
+
+def send_verification_email(user):
+    """Sends the email verification link to the user (queued, non-blocking)."""
+    return queue_account_email("verify", user)
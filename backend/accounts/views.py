@@ -1,9 +1,8 @@
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
+from django.utils.http import urlsafe_base64_decode
+from django.utils.encoding import force_str
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status
@@ -14,8 +13,8 @@ from rest_framework.views import APIView
 from django.contrib.auth import authenticate
 from rest_framework.permissions import IsAuthenticated
 from .models import Profile
-from django.utils import timezone
-from admin_portal.models import DailyUsageLog
+from .utils import queue_account_email, send_verification_email
+from admin_portal.utils import record_login
 
 
 # ----------------------------
@@ -29,16 +28,8 @@ class RegisterView(APIView):
             user.is_active = False
             user.save()
 
-            uid = urlsafe_base64_encode(force_bytes(user.pk))
-            token = default_token_generator.make_token(user)
-            verify_url = f"http://localhost:5173/verify-email/{uid}/{token}/"
-
-            send_mail(
-                subject="Verify your Investo account",
-                message=f"Hello {user.username},\n\nClick the link to verify your account:\n{verify_url}",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email],
-            )
+            # Sent by a Celery worker, the signup response does not wait on SMTP
+            send_verification_email(user)
 
             return Response(
                 {"message": "Account created! Please verify your email."},
@@ -75,13 +66,8 @@ class LoginView(APIView):
         if not user.is_active:
             return Response({"error": "Please verify your email before logging in!"}, status=403)
 
-        # Log daily usage for admin stats
-        try:
-            log, _ = DailyUsageLog.objects.get_or_create(user=user, date=timezone.now().date())
-            log.login_count += 1
-            log.save()
-        except Exception as e:
-            print(f"Failed to log daily usage: {e}")
+        # Log daily usage for admin stats (buffered, flushed by a Celery task)
+        record_login(user)
 
         refresh = RefreshToken.for_user(user)
         return Response({
@@ -134,17 +120,7 @@ def forgot_password(request):
             status=200
         )
 
-    uid = urlsafe_base64_encode(force_bytes(user.pk))
-    token = default_token_generator.make_token(user)
-
-    reset_url = f"http://localhost:5173/reset-password/{uid}/{token}/"
-
-    send_mail(
-        subject="Reset your Investo password",
-        message=f"Hi {user.username},\n\nClick the link to reset your password:\n{reset_url}",
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        recipient_list=[email],
-    )
+    queue_account_email("reset", user)
 
     return Response(
         {"message": "If the email exists, a reset link has been sent."},
@@ -225,13 +201,8 @@ def google_login(request):
             "is_active": True
         })
 
-        # Log daily usage for admin stats
-        try:
-            log, _ = DailyUsageLog.objects.get_or_create(user=user, date=timezone.now().date())
-            log.login_count += 1
-            log.save()
-        except Exception as e:
-            print(f"Failed to log daily usage: {e}")
+        # Log daily usage for admin stats (buffered, flushed by a Celery task)
+        record_login(user)
 
         refresh = RefreshToken.for_user(user)
         return Response({
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_portal', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetentionCohort',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort', models.DateField()),
+                ('week', models.PositiveSmallIntegerField()),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('retained', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-cohort', 'week'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total_users', models.PositiveIntegerField(default=0)),
+                ('new_users', models.PositiveIntegerField(default=0)),
+                ('logins', models.PositiveIntegerField(default=0)),
+                ('dau', models.PositiveIntegerField(default=0)),
+                ('wau', models.PositiveIntegerField(default=0)),
+                ('mau', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyusagelog',
+            index=models.Index(fields=['date', 'user'], name='admin_porta_date_732596_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='retentioncohort',
+            unique_together={('cohort', 'week')},
+        ),
+    ]
@@ -9,6 +9,42 @@ class DailyUsageLog(models.Model):
 
     class Meta:
         unique_together = ('user', 'date')
+        indexes = [
+            # Active-user counts scan one date range, not every user
+            models.Index(fields=["date", "user"]),
+        ]
 
     def __str__(self):
-        return f"{self.user.username} - {self.date}"
\ No newline at end of file
+        return f"{self.user.username} - {self.date}"
+
+
+class UsageRollup(models.Model):
+    """Site-wide activity for one day, written nightly by admin_portal.tasks."""
+    date = models.DateField(unique=True)
+    total_users = models.PositiveIntegerField(default=0)
+    new_users = models.PositiveIntegerField(default=0)
+    logins = models.PositiveIntegerField(default=0)
+    dau = models.PositiveIntegerField(default=0)
+    wau = models.PositiveIntegerField(default=0)
+    mau = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.date}: {self.dau} DAU"
+
+
+class RetentionCohort(models.Model):
+    """Users who signed up in the week of `cohort` and were active `week` weeks later."""
+    cohort = models.DateField()
+    week = models.PositiveSmallIntegerField()
+    size = models.PositiveIntegerField(default=0)
+    retained = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('cohort', 'week')
+        ordering = ["-cohort", "week"]
+
+    def __str__(self):
+        return f"{self.cohort} +{self.week}w: {self.retained}/{self.size}"
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from celery import shared_task
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+from . import utils
+from .models import DailyUsageLog, RetentionCohort, UsageRollup
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Signup weeks tracked in the retention table
+RETENTION_WEEKS = 12
+
+
+@shared_task
+def rollup_daily_usage(day=None):
+    """
+    Nightly rollup of yesterday's activity (or `day`, YYYY-MM-DD) into
+    UsageRollup and the retention cohorts, so the dashboard reads a handful
+    of precomputed rows instead of scanning the usage log.
+    """
+    if day is None:
+        day = timezone.now().date() - timedelta(days=1)
+    elif isinstance(day, str):
+        day = datetime.strptime(day, "%Y-%m-%d").date()
+
+    def active_since(days):
+        return (
+            DailyUsageLog.objects.filter(date__gt=day - timedelta(days=days), date__lte=day)
+            .values("user").distinct().count()
+        )
+
+    today = DailyUsageLog.objects.filter(date=day).aggregate(dau=Count("id"), logins=Sum("login_count"))
+
+    with transaction.atomic():
+        UsageRollup.objects.update_or_create(
+            date=day,
+            defaults={
+                "total_users": User.objects.filter(date_joined__date__lte=day).count(),
+                "new_users": User.objects.filter(date_joined__date=day).count(),
+                "logins": today["logins"] or 0,
+                "dau": today["dau"],
+                "wau": active_since(7),
+                "mau": active_since(30),
+            },
+        )
+        rollup_retention(day)
+
+    logger.info(f"USAGE ROLLUP: {day} DAU={today['dau']}")
+    return str(day)
+
+
+def rollup_retention(day):
+    """
+    Rebuilds weekly retention for the last RETENTION_WEEKS signup cohorts
+    with two grouped queries: cohort sizes, and distinct active users per
+    (signup week, activity week).
+    """
+    # Monday of the oldest cohort week
+    start = day - timedelta(days=day.weekday() + 7 * (RETENTION_WEEKS - 1))
+
+    sizes = {
+        row["cohort"].date(): row["size"]
+        for row in User.objects.filter(date_joined__date__gte=start, date_joined__date__lte=day)
+        .annotate(cohort=TruncWeek("date_joined")).values("cohort")
+        .annotate(size=Count("id"))
+    }
+
+    cohorts = {
+        (cohort, week): RetentionCohort(cohort=cohort, week=week, size=size)
+        for cohort, size in sizes.items()
+        for week in range((day - cohort).days // 7 + 1)
+    }
+
+    active = (
+        DailyUsageLog.objects.filter(
+            user__date_joined__date__gte=start, user__date_joined__date__lte=day,
+            date__gte=start, date__lte=day,
+        )
+        .annotate(cohort=TruncWeek("user__date_joined"), active_week=TruncWeek("date"))
+        .values("cohort", "active_week")
+        .annotate(users=Count("user", distinct=True))
+    )
+    for row in active:
+        week = (row["active_week"] - row["cohort"].date()).days // 7
+        key = (row["cohort"].date(), week)
+        if key in cohorts:
+            cohorts[key].retained = row["users"]
+
+    if cohorts:
+        RetentionCohort.objects.bulk_create(
+            cohorts.values(),
+            update_conflicts=True,
+            unique_fields=["cohort", "week"],
+            update_fields=["size", "retained"],
+        )
+
+
+@shared_task
+def flush_login_counts():
+    """Writes buffered login counters (see admin_portal.utils) to DailyUsageLog."""
+    flushed = utils.flush_login_counts()
+    if flushed:
+        logger.info(f"USAGE FLUSH: {flushed} daily usage rows updated")
+    return flushed
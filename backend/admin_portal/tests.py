@@ -1,3 +1,177 @@
-from django.test import TestCase
+from datetime import date, datetime
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import tasks, utils
+from .models import DailyUsageLog, RetentionCohort, UsageRollup
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class FlushLoginCountsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create_user(f"user{i}") for i in range(3)]
+
+    def login_counts(self):
+        return dict(DailyUsageLog.objects.values_list("user__username", "login_count"))
+
+    def test_counts_land_after_two_flushes(self):
+        for user in self.users:
+            utils.record_login(user)
+        utils.record_login(self.users[0])
+
+        # The generation just closed may still be receiving increments
+        self.assertEqual(utils.flush_login_counts(), 0)
+        self.assertEqual(utils.flush_login_counts(), 3)
+        self.assertEqual(self.login_counts(), {"user0": 2, "user1": 1, "user2": 1})
+        self.assertEqual(utils.flush_login_counts(), 0)
+
+    def test_failed_write_is_retried_on_the_next_flush(self):
+        utils.record_login(self.users[0])
+        utils.flush_login_counts()
+        utils.record_login(self.users[1])
+
+        with mock.patch.object(utils, "add_login_counts", side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                utils.flush_login_counts()
+        self.assertEqual(self.login_counts(), {})
+
+        utils.record_login(self.users[2])
+        utils.flush_login_counts()
+        utils.flush_login_counts()
+
+        self.assertEqual(self.login_counts(), {"user0": 1, "user1": 1, "user2": 1})
+
+    def test_registration_failure_counts_the_login_once(self):
+        real_set = cache.set
+
+        def flaky_set(key, *args, **kwargs):
+            if ":pending:" in key:
+                raise ConnectionError("cache went away")
+            return real_set(key, *args, **kwargs)
+
+        with mock.patch.object(utils.cache, "set", side_effect=flaky_set):
+            utils.record_login(self.users[0])
+        utils.flush_login_counts()
+        utils.flush_login_counts()
+
+        self.assertEqual(self.login_counts(), {"user0": 1})
+
+    def test_login_survives_cache_and_database_failures(self):
+        with mock.patch.object(utils.cache, "add", side_effect=ConnectionError("no cache")), \
+                mock.patch.object(utils, "add_login_counts", side_effect=DatabaseError("no db")):
+            utils.record_login(self.users[0])
+
+        self.assertEqual(self.login_counts(), {})
+
+    def test_flush_survives_an_evicted_marker(self):
+        utils.record_login(self.users[0])
+        utils.flush_login_counts()
+        real_get = cache.get
+
+        def evicting_get(key, *args, **kwargs):
+            if key == utils.FLUSHED_KEY:
+                cache.delete(key)
+            return real_get(key, *args, **kwargs)
+
+        with mock.patch.object(utils.cache, "get", side_effect=evicting_get):
+            utils.flush_login_counts()
+
+        self.assertEqual(self.login_counts(), {"user0": 1})
+
+    def test_falls_back_to_the_database_without_a_cache(self):
+        with mock.patch.object(utils.cache, "add", side_effect=ConnectionError("no cache")):
+            utils.record_login(self.users[0])
+
+        log = DailyUsageLog.objects.get()
+        self.assertEqual((log.user, log.date, log.login_count), (self.users[0], timezone.now().date(), 1))
+
+
+class UsageRollupTests(TestCase):
+    def setUp(self):
+        joined = {"a": (2025, 3, 3), "b": (2025, 3, 11), "c": (2025, 2, 24), "d": (2025, 3, 12)}
+        users = {name: User.objects.create_user(name, date_joined=datetime(*day, 10)) for name, day in joined.items()}
+        DailyUsageLog.objects.bulk_create([
+            DailyUsageLog(user=users["a"], date=date(2025, 3, 5), login_count=1),
+            DailyUsageLog(user=users["a"], date=date(2025, 3, 12), login_count=3),
+            DailyUsageLog(user=users["b"], date=date(2025, 3, 12), login_count=1),
+            DailyUsageLog(user=users["c"], date=date(2025, 3, 10), login_count=2),
+        ])
+
+    def test_daily_rollup(self):
+        self.assertEqual(tasks.rollup_daily_usage("2025-03-12"), "2025-03-12")
+
+        rollup = UsageRollup.objects.get(date=date(2025, 3, 12))
+        self.assertEqual(
+            (rollup.total_users, rollup.new_users, rollup.logins, rollup.dau, rollup.wau, rollup.mau),
+            (4, 1, 4, 2, 3, 3),
+        )
+
+    def test_retention_cohorts(self):
+        tasks.rollup_daily_usage("2025-03-12")
+
+        self.assertEqual(
+            list(RetentionCohort.objects.order_by("cohort", "week").values_list("cohort", "week", "size", "retained")),
+            [
+                (date(2025, 2, 24), 0, 1, 0), (date(2025, 2, 24), 1, 1, 0), (date(2025, 2, 24), 2, 1, 1),
+                (date(2025, 3, 3), 0, 1, 1), (date(2025, 3, 3), 1, 1, 1),
+                (date(2025, 3, 10), 0, 2, 1),
+            ],
+        )
+
+    def test_rerun_replaces_the_day(self):
+        tasks.rollup_daily_usage("2025-03-12")
+        DailyUsageLog.objects.filter(user__username="b").delete()
+        tasks.rollup_daily_usage("2025-03-12")
+
+        self.assertEqual(UsageRollup.objects.get().dau, 1)
+        self.assertEqual(RetentionCohort.objects.get(cohort=date(2025, 3, 10)).retained, 0)
+
+
+class AdminUserStatsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def make_users(self, count):
+        users = User.objects.bulk_create([User(username=f"user{i:03}") for i in range(count)])
+        today = timezone.now().date()
+        DailyUsageLog.objects.bulk_create([DailyUsageLog(user=u, date=today, login_count=2) for u in users[::2]])
+
+    def test_query_count_does_not_grow_with_users(self):
+        self.make_users(5)
+        with self.assertNumQueries(4):
+            small = self.client.get("/api/admin-portal/stats/").json()
+
+        User.objects.bulk_create([User(username=f"more{i:03}") for i in range(120)])
+        with self.assertNumQueries(4):
+            large = self.client.get("/api/admin-portal/stats/?page_size=200").json()
+
+        self.assertEqual(len(small["users"]), 6)
+        self.assertEqual(len(large["users"]), 126)
+
+    def test_pages_and_sorting(self):
+        self.make_users(5)
+
+        first = self.client.get("/api/admin-portal/stats/?sort=username&page_size=4").json()
+        second = self.client.get("/api/admin-portal/stats/?sort=username&page_size=4&page=2").json()
+
+        self.assertEqual([u["username"] for u in first["users"]], ["admin", "user000", "user001", "user002"])
+        self.assertTrue(first["has_next"])
+        self.assertEqual([u["username"] for u in second["users"]], ["user003", "user004"])
+        self.assertFalse(second["has_next"])
+        self.assertEqual(first["summary"], {
+            "total_users": 6, "active_today": 3, "wau": None, "mau": None, "rollup_date": None,
+        })
+        self.assertEqual(first["users"][1]["used_today_count"], 2)
+        self.assertEqual(first["users"][1]["total_days_active"], 1)
+
+    def test_invalid_sort_is_rejected(self):
+        self.assertEqual(self.client.get("/api/admin-portal/stats/?sort=password").status_code, 400)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import AdminLoginView, AdminUserStatsView
+from .views import AdminLoginView, AdminUserStatsView, AdminUsageMetricsView
 
 urlpatterns = [
     path('login/', AdminLoginView.as_view(), name='admin_login'),
     path('stats/', AdminUserStatsView.as_view(), name='admin_stats'),
+    path('metrics/', AdminUsageMetricsView.as_view(), name='admin_metrics'),
 ]
\ No newline at end of file
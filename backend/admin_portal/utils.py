@@ -0,0 +1,118 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+from .models import DailyUsageLog
+import logging
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+# Logins are counted in the cache per flush generation. Each flush opens a
+# new generation and drains everything up to the one before the previous, so
+# increments that read the old generation number just before the switch still
+# land first. A generation only counts as flushed once its write succeeded.
+USAGE_KEY_PREFIX = "usage:logins:"
+GENERATION_KEY = USAGE_KEY_PREFIX + "generation"
+FLUSHED_KEY = USAGE_KEY_PREFIX + "flushed"
+COUNTER_TIMEOUT = 60 * 60 * 24
+
+
+def _counter_key(generation, day, user_id):
+    return f"{USAGE_KEY_PREFIX}{generation}:{day}:{user_id}"
+
+
+def _registry_key(generation, index):
+    return f"{USAGE_KEY_PREFIX}{generation}:pending:{index}"
+
+
+def _sequence_key(generation):
+    return f"{USAGE_KEY_PREFIX}{generation}:pending"
+
+
+def record_login(user):
+    """
+    Counts one login towards today's DailyUsageLog without touching the
+    database: the cache counter is flushed in bulk by flush_login_counts.
+    Falls back to an atomic database increment if the cache is unreachable,
+    and never raises, so usage tracking cannot break a login.
+    """
+    day = timezone.now().date()
+    try:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY)
+        key = _counter_key(generation, day, user.id)
+        if cache.get(key) is None:
+            # First login in this generation: register the key for the flush
+            # before counting, so a counted login is always flushed. Racing
+            # first logins may register twice, which the flush collapses.
+            cache.add(_sequence_key(generation), 0, COUNTER_TIMEOUT)
+            index = cache.incr(_sequence_key(generation))
+            cache.set(_registry_key(generation, index), (day, user.id), COUNTER_TIMEOUT)
+        # Counting is the last cache call: if it raised, the login was not counted
+        if not cache.add(key, 1, COUNTER_TIMEOUT):
+            cache.incr(key)
+        return
+    except Exception as e:
+        logger.error(f"Failed to buffer daily usage: {e}")
+
+    try:
+        add_login_counts({(user.id, day): 1})
+    except Exception as e:
+        logger.error(f"Failed to record daily usage: {e}")
+
+
+def flush_login_counts():
+    """
+    Opens a new counter generation and writes every closed generation not yet
+    flushed to DailyUsageLog. A failed write leaves its counters in the cache
+    for the next flush. Returns the number of (user, day) rows touched.
+    """
+    if cache.add(GENERATION_KEY, 2, timeout=None):
+        return 0
+    current = cache.incr(GENERATION_KEY)
+    # Without a marker, everything older was drained before it was introduced
+    cache.add(FLUSHED_KEY, current - 3, timeout=None)
+
+    touched = 0
+    for generation in range(cache.get(FLUSHED_KEY, current - 3) + 1, current - 1):
+        count = cache.get(_sequence_key(generation)) or 0
+        registry = cache.get_many([_registry_key(generation, i) for i in range(1, count + 1)])
+        counter_keys = {_counter_key(generation, day, user_id): (user_id, day) for day, user_id in registry.values()}
+        counters = cache.get_many(counter_keys.keys())
+
+        counts = {counter_keys[key]: n for key, n in counters.items() if n}
+        # All or nothing, so a retried generation is never counted twice
+        with transaction.atomic():
+            add_login_counts(counts)
+        cache.set(FLUSHED_KEY, generation, timeout=None)
+
+        cache.delete_many([_sequence_key(generation), *registry.keys(), *counter_keys.keys()])
+        touched += len(counts)
+    return touched
+
+
+def add_login_counts(counts):
+    """
+    Adds {(user_id, day): logins} to DailyUsageLog. Missing rows are created
+    first, then each batch is incremented with a single F()-based UPDATE, so
+    concurrent writers never overwrite each other.
+    """
+    items = list(counts.items())
+    for start in range(0, len(items), BATCH_SIZE):
+        batch = items[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            DailyUsageLog.objects.bulk_create(
+                [DailyUsageLog(user_id=user_id, date=day) for (user_id, day), _ in batch],
+                ignore_conflicts=True,
+            )
+            match = Q()
+            for (user_id, day), _ in batch:
+                match |= Q(user_id=user_id, date=day)
+            DailyUsageLog.objects.filter(match).update(
+                login_count=F("login_count") + Case(
+                    *[When(user_id=user_id, date=day, then=Value(n)) for (user_id, day), n in batch],
+                    default=Value(0), output_field=IntegerField(),
+                )
+            )
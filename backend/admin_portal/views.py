@@ -1,4 +1,7 @@
+from datetime import timedelta
 from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -6,7 +9,8 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from .models import DailyUsageLog
+from .models import DailyUsageLog, RetentionCohort, UsageRollup
+from .utils import record_login
 
 # ----------------------------
 # ADMIN LOGIN
@@ -32,10 +36,8 @@ class AdminLoginView(APIView):
         if not user.is_staff:
             return Response({"error": "Access denied. You are not an admin."}, status=403)
 
-        # Log daily usage for the admin themselves
-        log, _ = DailyUsageLog.objects.get_or_create(user=user, date=timezone.now().date())
-        log.login_count += 1
-        log.save()
+        # Log daily usage for the admin themselves (buffered, see utils.py)
+        record_login(user)
 
         refresh = RefreshToken.for_user(user)
         return Response({
@@ -54,39 +56,95 @@ class AdminLoginView(APIView):
 class AdminUserStatsView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
+    # ?sort= values; prefix with "-" for descending
+    SORT_FIELDS = ("date_joined", "username", "email", "used_today_count", "total_days_active")
+    DEFAULT_SORT = "-date_joined"
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+
     def get(self, request):
         today = timezone.now().date()
-        
+
+        sort = request.query_params.get("sort", self.DEFAULT_SORT)
+        if sort.lstrip("-") not in self.SORT_FIELDS:
+            return Response({"error": f"sort must be one of {', '.join(self.SORT_FIELDS)}"}, status=400)
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+            page_size = max(1, min(int(request.query_params.get("page_size", self.PAGE_SIZE)), self.MAX_PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "page and page_size must be integers"}, status=400)
+
         # General Stats
         total_users = User.objects.count()
         active_today = DailyUsageLog.objects.filter(date=today).count()
+        latest = UsageRollup.objects.first()
 
-        # Detailed User List
-        users_list = []
-        all_users = User.objects.all().order_by('-date_joined')
-
-        for u in all_users:
-            # Get usage for today specifically
-            today_log = DailyUsageLog.objects.filter(user=u, date=today).first()
-            today_count = today_log.login_count if today_log else 0
-            
-            # Get total lifetime usage
-            total_uses = DailyUsageLog.objects.filter(user=u).count() # Days used
-
-            users_list.append({
-                "id": u.id,
-                "username": u.username,
-                "email": u.email,
-                "date_joined": u.date_joined.strftime("%Y-%m-%d"),
-                "used_today_count": today_count,
-                "total_days_active": total_uses,
-                "is_staff": u.is_staff
-            })
+        # Per-user usage as correlated subqueries: one query for the page,
+        # each subquery an index lookup on (user, date)
+        logs = DailyUsageLog.objects.filter(user=OuterRef("pk"))
+        users = (
+            User.objects.annotate(
+                used_today_count=Coalesce(
+                    Subquery(logs.filter(date=today).values("login_count")[:1]),
+                    Value(0), output_field=IntegerField(),
+                ),
+                total_days_active=Coalesce(
+                    Subquery(logs.values("user").annotate(days=Count("id")).values("days")[:1]),
+                    Value(0), output_field=IntegerField(),
+                ),
+            )
+            .order_by(sort, "-id" if sort.startswith("-") else "id")
+            .values("id", "username", "email", "date_joined", "used_today_count", "total_days_active", "is_staff")
+        )
+        offset = (page - 1) * page_size
+        rows = list(users[offset:offset + page_size])
+
+        for u in rows:
+            u["date_joined"] = u["date_joined"].strftime("%Y-%m-%d")
 
         return Response({
             "summary": {
                 "total_users": total_users,
-                "active_today": active_today
+                "active_today": active_today,
+                # From the nightly rollup; null until it has run once
+                "wau": latest.wau if latest else None,
+                "mau": latest.mau if latest else None,
+                "rollup_date": latest.date if latest else None,
             },
-            "users": users_list
-        })
\ No newline at end of file
+            "page": page,
+            "page_size": page_size,
+            "has_next": offset + len(rows) < total_users,
+            "users": rows,
+        })
+
+
+# ----------------------------
+# HISTORICAL METRICS (nightly rollups)
+# ----------------------------
+class AdminUsageMetricsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    MAX_DAYS = 365
+
+    def get(self, request):
+        try:
+            days = max(1, min(int(request.query_params.get("days", 30)), self.MAX_DAYS))
+        except ValueError:
+            return Response({"error": "days must be an integer"}, status=400)
+
+        since = timezone.now().date() - timedelta(days=days)
+        daily = (
+            UsageRollup.objects.filter(date__gt=since).order_by("date")
+            .values("date", "total_users", "new_users", "logins", "dau", "wau", "mau")
+        )
+
+        # {cohort: {"size": n, "weeks": [retained fraction per week]}}
+        retention = {}
+        for c in RetentionCohort.objects.order_by("cohort", "week"):
+            entry = retention.setdefault(str(c.cohort), {"size": c.size, "weeks": []})
+            entry["weeks"].append(round(c.retained / c.size, 4) if c.size else 0.0)
+
+        return Response({
+            "daily": list(daily),
+            "retention": retention,
+        })
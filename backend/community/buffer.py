@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from channels.db import database_sync_to_async
+from django.conf import settings
+from .models import Message
+from .utils import chat_room
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on messages written and broadcast as one batch
+MAX_BATCH_SIZE = 500
+
+# Group id -> GroupMessageBuffer, per ASGI process
+_buffers = {}
+
+
+class GroupMessageBuffer:
+    """
+    Collects one group's chat messages for a short window, then saves them
+    with a single bulk_create and broadcasts them as one "chat_batch" event.
+    One flush task runs per group at a time, so batches (and the messages
+    inside them) reach clients in the order they were received.
+    """
+
+    def __init__(self, group_id, channel_layer):
+        self.group_id = group_id
+        self.channel_layer = channel_layer
+        self.pending = []
+        self.task = None
+
+    def add(self, user, content, reply_channel, client_id=None):
+        self.pending.append((user, content, reply_channel, client_id))
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        while self.pending:
+            await asyncio.sleep(settings.COMMUNITY_CHAT_BUFFER_WINDOW)
+            batch, self.pending = self.pending[:MAX_BATCH_SIZE], self.pending[MAX_BATCH_SIZE:]
+            try:
+                saved = await self.save(batch)
+            except Exception as e:
+                logger.error(f"CHAT BUFFER ERROR: group {self.group_id}: {e}")
+                await self.reject(batch)
+                continue
+            # Stored from here on: a failed broadcast is only logged, since a
+            # retry from the client would store the messages a second time
+            await self.publish(batch, saved)
+
+    @database_sync_to_async
+    def save(self, batch):
+        return Message.objects.bulk_create([
+            Message(group_id=self.group_id, sender=user, content=content)
+            for user, content, _, _ in batch
+        ])
+
+    async def publish(self, batch, saved):
+        messages = [
+            {
+                "id": msg.id,
+                "message": msg.content,
+                "sender": user.username,
+                "sender_id": user.id,
+                "timestamp": msg.timestamp.isoformat(),
+            }
+            for msg, (user, _, _, _) in zip(saved, batch)
+        ]
+        try:
+            await self.channel_layer.group_send(
+                chat_room(self.group_id), {"type": "chat_batch", "messages": messages}
+            )
+        except Exception as e:
+            logger.error(f"CHAT BUFFER ERROR: broadcast to group {self.group_id}: {e}")
+
+        # Delivery acknowledgements, one event per sending connection
+        acks = {}
+        for msg, (_, _, reply_channel, client_id) in zip(messages, batch):
+            if client_id is not None:
+                acks.setdefault(reply_channel, []).append(
+                    {"client_id": client_id, "id": msg["id"], "timestamp": msg["timestamp"]}
+                )
+        for reply_channel, items in acks.items():
+            try:
+                await self.channel_layer.send(reply_channel, {"type": "chat_ack", "acks": items})
+            except Exception as e:
+                logger.error(f"CHAT BUFFER ERROR: ack to {reply_channel}: {e}")
+
+    async def reject(self, batch):
+        senders = {reply_channel for _, _, reply_channel, _ in batch}
+        for reply_channel in senders:
+            await self.channel_layer.send(reply_channel, {
+                "type": "chat_error",
+                "message": "Message could not be delivered, please retry.",
+            })
+
+
+def buffer_message(group_id, channel_layer, user, content, reply_channel, client_id=None):
+    """Queues a message on the group's buffer (see GroupMessageBuffer)."""
+    buffer = _buffers.get(group_id)
+    if buffer is None or buffer.channel_layer is not channel_layer:
+        buffer = _buffers[group_id] = GroupMessageBuffer(group_id, channel_layer)
+    buffer.add(user, content, reply_channel, client_id)
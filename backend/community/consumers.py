@@ -1,9 +1,14 @@
 import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import User
 from rest_framework_simplejwt.tokens import AccessToken
 from .models import ChatGroup, Membership, Message
+from .buffer import buffer_message
+from .presence import get_presence
+from .utils import chat_room, mark_read
 
 
 class ChatConsumer(AsyncWebsocketConsumer):
@@ -11,7 +16,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
 
     async def connect(self):
         self.group_id = self.scope["url_route"]["kwargs"]["group_id"]
-        self.room_group_name = f"chat_{self.group_id}"
+        self.room_group_name = chat_room(self.group_id)
 
         # Authenticate via JWT token in query string
         query_string = self.scope.get("query_string", b"").decode()
@@ -23,47 +28,97 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
 
-        # Verify membership
-        is_member = await self.check_membership(self.user, self.group_id)
-        if not is_member:
+        # Verify membership and load the posting rules once per connection;
+        # membership_changed / group_changed events keep them current
+        state = await self.load_group_state(self.user, self.group_id)
+        if state is None:
             await self.close()
             return
+        self.is_announcement, self.role = state
 
         # Join channel group
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
+        self.present = True
 
-        # Send join notification
+        # Send join notification, only for the user's first open connection
+        first = await self.presence("touch")
+        if first:
+            await self.send_user_event("joined")
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "room_group_name"):
+            await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+
+        # Leave notification once the user's last connection is gone
+        if getattr(self, "present", False):
+            self.present = False
+            if await self.presence("leave"):
+                await self.send_user_event("left")
+
+    async def presence(self, action):
+        """Runs a registry call (see community.presence) off the event loop."""
+        call = getattr(get_presence(), action)
+        return await sync_to_async(call, thread_sensitive=False)(
+            self.group_id, self.channel_name, self.user.id
+        )
+
+    async def send_user_event(self, event):
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 "type": "user_event",
-                "event": "joined",
+                "event": event,
                 "username": self.user.username,
             },
         )
 
-    async def disconnect(self, close_code):
-        if hasattr(self, "room_group_name"):
-            await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
-
     async def receive(self, text_data):
         data = json.loads(text_data)
+
+        # Keeps this connection in the presence registry (see HEARTBEAT_INTERVAL)
+        if data.get("type") == "heartbeat":
+            await self.presence("touch")
+            return
+
+        # Read marker: {"type": "read", "message_id": <id, optional>}
+        if data.get("type") == "read":
+            message_id = data.get("message_id")
+            if message_id is not None and not isinstance(message_id, int):
+                return
+            last_read = await self.mark_read(message_id)
+            if last_read is not None:
+                await self.channel_layer.group_send(self.room_group_name, {
+                    "type": "read_receipt",
+                    "user_id": self.user.id,
+                    "username": self.user.username,
+                    "message_id": last_read,
+                })
+            return
+
         message_content = data.get("message", "").strip()
 
         if not message_content:
             return
 
         # Check if announcement channel — only admins can post
-        is_announcement = await self.is_announcement_group(self.group_id)
-        if is_announcement:
-            is_admin = await self.is_group_admin(self.user, self.group_id)
-            if not is_admin:
-                await self.send(text_data=json.dumps({
-                    "type": "error",
-                    "message": "Only admins can post in announcement channels.",
-                }))
-                return
+        if self.is_announcement and not self.is_admin:
+            await self.send(text_data=json.dumps({
+                "type": "error",
+                "message": "Only admins can post in announcement channels.",
+            }))
+            return
+
+        # Optional id the client uses to match the delivery acknowledgement
+        client_id = data.get("client_id")
+
+        # Buffered mode: saved and broadcast in batches (see community.buffer)
+        if settings.COMMUNITY_CHAT_BUFFERED:
+            buffer_message(
+                self.group_id, self.channel_layer, self.user,
+                message_content, self.channel_name, client_id,
+            )
+            return
 
         # Save message to DB
         saved_msg = await self.save_message(self.user, self.group_id, message_content)
@@ -81,6 +136,11 @@ class ChatConsumer(AsyncWebsocketConsumer):
             },
         )
 
+        if client_id is not None:
+            await self.chat_ack({"acks": [
+                {"client_id": client_id, "id": saved_msg.id, "timestamp": saved_msg.timestamp.isoformat()}
+            ]})
+
     # ── Handler for chat messages ──
     async def chat_message(self, event):
         await self.send(text_data=json.dumps({
@@ -92,6 +152,50 @@ class ChatConsumer(AsyncWebsocketConsumer):
             "timestamp": event["timestamp"],
         }))
 
+    # ── Handlers for buffered mode: one frame per batch ──
+    async def chat_batch(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "messages",
+            "messages": event["messages"],
+        }))
+
+    async def chat_ack(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "ack",
+            "acks": event["acks"],
+        }))
+
+    async def chat_error(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "error",
+            "message": event["message"],
+        }))
+
+    # ── Handlers for membership / group changes (see community.signals) ──
+    async def membership_changed(self, event):
+        if event["user_id"] != self.user.id:
+            return
+        self.role = event["role"]
+        # Removed from the group: drop the connection unless site staff
+        if self.role is None and not self.user.is_staff:
+            await self.close()
+
+    async def group_changed(self, event):
+        self.is_announcement = event["is_announcement"]
+
+    @property
+    def is_admin(self):
+        return self.user.is_staff or self.role == "admin"
+
+    # ── Handler for read receipts ──
+    async def read_receipt(self, event):
+        await self.send(text_data=json.dumps({
+            "type": "read",
+            "user_id": event["user_id"],
+            "username": event["username"],
+            "message_id": event["message_id"],
+        }))
+
     # ── Handler for user events (join/leave) ──
     async def user_event(self, event):
         await self.send(text_data=json.dumps({
@@ -111,28 +215,26 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return None
 
     @database_sync_to_async
-    def check_membership(self, user, group_id):
-        if user.is_staff:
-            return True
-        return Membership.objects.filter(user=user, group_id=group_id).exists()
+    def load_group_state(self, user, group_id):
+        """(is_announcement, role) for the user, or None if they may not join."""
+        group = ChatGroup.objects.filter(id=group_id).values("is_announcement").first()
+        if group is None:
+            return None
+        role = (
+            Membership.objects.filter(user=user, group_id=group_id)
+            .values_list("role", flat=True).first()
+        )
+        if role is None and not user.is_staff:
+            return None
+        return group["is_announcement"], role
+
+    @database_sync_to_async
+    def mark_read(self, message_id):
+        # Staff without a membership have no read marker to move
+        return mark_read(self.user.id, self.group_id, message_id)
 
     @database_sync_to_async
     def save_message(self, user, group_id, content):
         return Message.objects.create(
             group_id=group_id, sender=user, content=content
         )
-
-    @database_sync_to_async
-    def is_announcement_group(self, group_id):
-        try:
-            return ChatGroup.objects.get(id=group_id).is_announcement
-        except ChatGroup.DoesNotExist:
-            return False
-
-    @database_sync_to_async
-    def is_group_admin(self, user, group_id):
-        if user.is_staff:
-            return True
-        return Membership.objects.filter(
-            user=user, group_id=group_id, role="admin"
-        ).exists()
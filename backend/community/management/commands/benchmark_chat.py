@@ -0,0 +1,113 @@
+import asyncio
+import time
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from community.models import ChatGroup, Membership, Message
+from community.routing import websocket_urlpatterns
+
+IN_MEMORY_LAYER = {
+    "default": {
+        "BACKEND": "channels.layers.InMemoryChannelLayer",
+        # Large enough that no frame is dropped under load
+        "CONFIG": {"capacity": 1_000_000},
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests ChatConsumer on the in-memory channel layer, direct vs "
+        "buffered mode. Creates a temporary group and users, removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=20)
+        parser.add_argument("--messages", type=int, default=50, help="Messages sent per client")
+        parser.add_argument("--window", type=float, default=0.05, help="Buffer window in seconds")
+        parser.add_argument("--timeout", type=float, default=60)
+
+    def handle(self, *args, **options):
+        clients, per_client = options["clients"], options["messages"]
+        users = [
+            User.objects.create_user(f"bench-chat-{i}-{time.time_ns()}")
+            for i in range(clients)
+        ]
+        group = ChatGroup.objects.create(name="bench-chat", creator=users[0])
+        Membership.objects.bulk_create([Membership(user=u, group=group) for u in users])
+        tokens = [str(AccessToken.for_user(u)) for u in users]
+
+        try:
+            for buffered in (False, True):
+                with override_settings(
+                    CHANNEL_LAYERS=IN_MEMORY_LAYER,
+                    COMMUNITY_CHAT_BUFFERED=buffered,
+                    COMMUNITY_CHAT_BUFFER_WINDOW=options["window"],
+                ):
+                    elapsed, frames, delivered = asyncio.run(
+                        self.run_load(group.id, tokens, per_client, options["timeout"])
+                    )
+                saved = Message.objects.filter(group=group).count()
+                Message.objects.filter(group=group).delete()
+
+                total = clients * per_client
+                self.stdout.write(
+                    f"{'buffered' if buffered else 'direct':>8}: {total} messages from {clients} clients "
+                    f"in {elapsed * 1000:.0f} ms ({total / elapsed:.0f} msg/s), "
+                    f"{frames} frames per client, {delivered}/{total} delivered, {saved} saved"
+                )
+        finally:
+            group.delete()
+            User.objects.filter(id__in=[u.id for u in users]).delete()
+
+    async def run_load(self, group_id, tokens, per_client, timeout):
+        application = URLRouter(websocket_urlpatterns)
+        communicators = [
+            WebsocketCommunicator(application, f"/ws/chat/{group_id}/?token={token}")
+            for token in tokens
+        ]
+        for communicator in communicators:
+            connected, _ = await communicator.connect()
+            if not connected:
+                raise RuntimeError("Benchmark client could not connect")
+
+        total = len(communicators) * per_client
+        start = time.perf_counter()
+
+        async def send(index, communicator):
+            for n in range(per_client):
+                await communicator.send_json_to({"message": f"{index}:{n}", "client_id": n})
+
+        async def listen(communicator):
+            # Counts chat frames and messages reaching one client, in order
+            frames = received = 0
+            last = {}
+            while received < total:
+                frame = await communicator.receive_json_from(timeout=timeout)
+                if frame["type"] == "message":
+                    batch = [frame]
+                elif frame["type"] == "messages":
+                    batch = frame["messages"]
+                else:
+                    continue
+                frames += 1
+                for message in batch:
+                    sender, n = map(int, message["message"].split(":"))
+                    if n != last.get(sender, -1) + 1:
+                        raise RuntimeError(f"Out of order message from client {sender}")
+                    last[sender] = n
+                received += len(batch)
+            return frames, received
+
+        listeners = [asyncio.create_task(listen(c)) for c in communicators]
+        await asyncio.gather(*(send(i, c) for i, c in enumerate(communicators)))
+        results = await asyncio.gather(*listeners)
+        elapsed = time.perf_counter() - start
+
+        for communicator in communicators:
+            await communicator.disconnect()
+
+        return elapsed, results[0][0], min(received for _, received in results)
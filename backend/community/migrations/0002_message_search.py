@@ -0,0 +1,84 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:22
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# PostgreSQL: tsvector column filled by a trigger on every insert or content
+# edit, searched through a GIN index
+POSTGRES_FORWARD = [
+    """
+    CREATE TRIGGER community_message_search_update
+    BEFORE INSERT OR UPDATE OF content ON community_message
+    FOR EACH ROW EXECUTE FUNCTION
+    tsvector_update_trigger(search_vector, 'pg_catalog.english', content)
+    """,
+    "UPDATE community_message SET search_vector = to_tsvector('pg_catalog.english', content)",
+    "CREATE INDEX community_message_search_idx ON community_message USING gin (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS community_message_search_idx",
+    "DROP TRIGGER IF EXISTS community_message_search_update ON community_message",
+]
+
+# SQLite (development and tests): FTS5 external-content table kept in sync
+# with community_message by triggers. A later migration that rebuilds the
+# message table on SQLite has to recreate these triggers.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE community_message_fts USING fts5(
+        content, content='community_message', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER community_message_fts_insert AFTER INSERT ON community_message BEGIN
+        INSERT INTO community_message_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER community_message_fts_delete AFTER DELETE ON community_message BEGIN
+        INSERT INTO community_message_fts(community_message_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER community_message_fts_update AFTER UPDATE OF content ON community_message BEGIN
+        INSERT INTO community_message_fts(community_message_fts, rowid, content)
+        VALUES ('delete', old.id, old.content);
+        INSERT INTO community_message_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    "INSERT INTO community_message_fts(community_message_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS community_message_fts_insert",
+    "DROP TRIGGER IF EXISTS community_message_fts_delete",
+    "DROP TRIGGER IF EXISTS community_message_fts_update",
+    "DROP TABLE IF EXISTS community_message_fts",
+]
+
+
+def run_for_vendor(postgres, sqlite):
+    def run(apps, schema_editor):
+        statements = {"postgresql": postgres, "sqlite": sqlite}.get(schema_editor.connection.vendor, [])
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_for_vendor(POSTGRES_FORWARD, SQLITE_FORWARD),
+            run_for_vendor(POSTGRES_BACKWARD, SQLITE_BACKWARD),
+        ),
+    ]
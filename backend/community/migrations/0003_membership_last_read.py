@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def mark_history_read(apps, schema_editor):
+    # Existing members start with everything up to now read, so the first
+    # unread counts after deploy are empty instead of whole group histories
+    Membership = apps.get_model('community', 'Membership')
+    Message = apps.get_model('community', 'Message')
+    newest = Message.objects.filter(group=OuterRef('group')).order_by('-id').values('id')[:1]
+    Membership.objects.filter(last_read_message_id__isnull=True).update(last_read_message_id=Subquery(newest))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_message_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membership',
+            name='last_read_message_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['group', 'id'], name='community_m_group_i_759156_idx'),
+        ),
+        migrations.RunPython(mark_history_read, migrations.RunPython.noop),
+    ]
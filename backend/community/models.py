@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -27,6 +28,8 @@ class Membership(models.Model):
     group = models.ForeignKey(ChatGroup, on_delete=models.CASCADE, related_name="memberships")
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default="member")
     joined_at = models.DateTimeField(auto_now_add=True)
+    # Newest message the user has read; later messages count as unread
+    last_read_message_id = models.BigIntegerField(null=True, blank=True)
 
     class Meta:
         unique_together = ("user", "group")
@@ -42,11 +45,16 @@ class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name="chat_messages")
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
+    # Full-text index of `content`, kept current by a database trigger on
+    # PostgreSQL (see migration 0002 and community/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         ordering = ["timestamp"]
         indexes = [
             models.Index(fields=["group", "timestamp"]),
+            # Unread counts range-scan messages after the last read id
+            models.Index(fields=["group", "id"]),
         ]
 
     def __str__(self):
@@ -0,0 +1,136 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+PRESENCE_KEY_PREFIX = "presence:"
+
+# A connection counts as online until this many seconds after its last
+# heartbeat; clients send one every HEARTBEAT_INTERVAL seconds. A connection
+# that dies without a disconnect (crashed worker, dropped network) simply
+# expires: it leaves online() but no "left" event is ever sent for it, so the
+# joined/left stream is a hint and clients should re-read online_members.
+HEARTBEAT_INTERVAL = 30
+PRESENCE_TTL = 75
+
+
+class RedisPresence:
+    """
+    Presence kept in the Redis server behind the channel layer, so every ASGI
+    worker sees the same state. Per group, one sorted set maps user id to
+    expiry, and one sorted set per user maps channel name to expiry.
+    Every operation is a single round trip.
+    """
+
+    # Removing the last connection and the user must be atomic, or a
+    # reconnect in between would be dropped from the group
+    LEAVE_SCRIPT = """
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[2])
+    if redis.call('ZCARD', KEYS[2]) == 0 then
+        redis.call('ZREM', KEYS[1], ARGV[3])
+        return 1
+    end
+    return 0
+    """
+
+    def __init__(self, client):
+        self.redis = client
+        self.leave_script = client.register_script(self.LEAVE_SCRIPT)
+
+    def _keys(self, group_id, user_id):
+        group_key = f"{PRESENCE_KEY_PREFIX}{group_id}"
+        return group_key, f"{group_key}:{user_id}"
+
+    def touch(self, group_id, channel_name, user_id):
+        """Registers or refreshes a connection; True if it is the user's only one."""
+        group_key, user_key = self._keys(group_id, user_id)
+        now = time.time()
+        expires = now + PRESENCE_TTL
+        pipe = self.redis.pipeline()
+        pipe.zremrangebyscore(user_key, "-inf", now)
+        pipe.zadd(user_key, {channel_name: expires})
+        pipe.zcard(user_key)
+        pipe.zadd(group_key, {user_id: expires})
+        pipe.expire(user_key, PRESENCE_TTL)
+        pipe.expire(group_key, PRESENCE_TTL)
+        return pipe.execute()[2] == 1
+
+    def leave(self, group_id, channel_name, user_id):
+        """Drops a connection; True if the user has no other live connection."""
+        group_key, user_key = self._keys(group_id, user_id)
+        return bool(self.leave_script(keys=[group_key, user_key], args=[channel_name, time.time(), user_id]))
+
+    def online(self, group_id):
+        """
+        Ids of users with at least one live connection in the group. Expired
+        connections are dropped silently (see PRESENCE_TTL).
+        """
+        group_key = f"{PRESENCE_KEY_PREFIX}{group_id}"
+        pipe = self.redis.pipeline()
+        pipe.zremrangebyscore(group_key, "-inf", time.time())
+        pipe.zrange(group_key, 0, -1)
+        return [int(user_id) for user_id in pipe.execute()[1]]
+
+
+class CachePresence:
+    """
+    Fallback for channel layers without Redis (e.g. the in-memory layer in
+    development): one {user_id: {channel: expiry}} entry per group in the
+    Django cache. Updates are read-modify-write, so only single-process use
+    is exact.
+    """
+
+    def _get(self, group_id):
+        now = time.time()
+        entries = cache.get(f"{PRESENCE_KEY_PREFIX}{group_id}", {})
+        return {
+            user_id: live
+            for user_id, channels in entries.items()
+            if (live := {name: exp for name, exp in channels.items() if exp > now})
+        }
+
+    def _set(self, group_id, entries):
+        cache.set(f"{PRESENCE_KEY_PREFIX}{group_id}", entries, PRESENCE_TTL)
+
+    def touch(self, group_id, channel_name, user_id):
+        entries = self._get(group_id)
+        channels = entries.setdefault(user_id, {})
+        channels[channel_name] = time.time() + PRESENCE_TTL
+        self._set(group_id, entries)
+        return len(channels) == 1
+
+    def leave(self, group_id, channel_name, user_id):
+        entries = self._get(group_id)
+        channels = entries.get(user_id, {})
+        channels.pop(channel_name, None)
+        if not channels:
+            entries.pop(user_id, None)
+        self._set(group_id, entries)
+        return not channels
+
+    def online(self, group_id):
+        return list(self._get(group_id))
+
+
+_registry = None
+
+
+def get_presence():
+    """Picks the registry matching the configured channel layer (built once)."""
+    global _registry
+    if _registry is None:
+        layer = settings.CHANNEL_LAYERS.get("default", {})
+        if layer.get("BACKEND", "").startswith("channels_redis."):
+            import redis
+
+            host = layer.get("CONFIG", {}).get("hosts", [("127.0.0.1", 6379)])[0]
+            if isinstance(host, str):
+                client = redis.Redis.from_url(host)
+            elif isinstance(host, dict):
+                client = redis.Redis.from_url(host["address"]) if "address" in host else redis.Redis(**host)
+            else:
+                client = redis.Redis(host=host[0], port=host[1])
+            _registry = RedisPresence(client)
+        else:
+            _registry = CachePresence()
+    return _registry
@@ -0,0 +1,79 @@
+import re
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils.html import escape
+
+SEARCH_CONFIG = "english"
+MAX_QUERY_LENGTH = 200
+
+# Highlight markers chosen so they never occur in chat text; the snippet is
+# HTML-escaped first and the markers then become <mark> tags
+_START, _STOP = "\x02", "\x03"
+
+
+def _postgres_search(queryset, text):
+    query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    return queryset.filter(search_vector=query).annotate(
+        # float8, so cursor values survive the JSON round trip exactly
+        rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+        headline=SearchHeadline(
+            "content", query, config=SEARCH_CONFIG,
+            start_sel=_START, stop_sel=_STOP, fragment_delimiter=" … ",
+            max_words=30, min_words=10, max_fragments=2,
+        ),
+    )
+
+
+def _sqlite_search(queryset, text):
+    # FTS5 syntax errors on stray operators, so only bare words are matched
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return queryset.annotate(rank=Value(0.0), headline=Value("")).none()
+    match = " ".join(f'"{term}"' for term in terms)
+    fts = "SELECT {} FROM community_message_fts WHERE community_message_fts MATCH %s AND rowid = community_message.id"
+    return queryset.filter(
+        id__in=RawSQL("SELECT rowid FROM community_message_fts WHERE community_message_fts MATCH %s", [match])
+    ).annotate(
+        # bm25() is lower-is-better, so it is negated to sort like ts_rank
+        rank=RawSQL(fts.format("-bm25(community_message_fts)"), [match], output_field=FloatField()),
+        headline=RawSQL(
+            fts.format(f"snippet(community_message_fts, 0, '{_START}', '{_STOP}', ' … ', 30)"),
+            [match], output_field=TextField(),
+        ),
+    )
+
+
+def _fallback_search(queryset, text):
+    # Other databases: unranked, unindexed substring match on every word
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return queryset.annotate(rank=Value(0.0), headline=Value("")).none()
+    match = Q()
+    for term in terms:
+        match &= Q(content__icontains=term)
+    return queryset.filter(match).annotate(
+        rank=Value(0.0, output_field=FloatField()), headline=F("content"),
+    )
+
+
+def search_messages(queryset, text):
+    """
+    Full-text matches of `text` within a Message queryset, annotated with
+    `rank` (higher is better) and a marked-up `headline`. Uses the tsvector
+    GIN index on PostgreSQL and the FTS5 table on SQLite; other databases
+    get a plain substring match with every rank equal.
+    """
+    text = text[:MAX_QUERY_LENGTH]
+    if connection.vendor == "postgresql":
+        return _postgres_search(queryset, text)
+    if connection.vendor == "sqlite":
+        return _sqlite_search(queryset, text)
+    return _fallback_search(queryset, text)
+
+
+def render_headline(headline):
+    """HTML-safe snippet with the matched words wrapped in <mark>."""
+    return escape(headline or "").replace(_START, "<mark>").replace(_STOP, "</mark>")
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import ChatGroup, Membership, Message
+from .search import render_headline
 
 
 class UserMiniSerializer(serializers.ModelSerializer):
@@ -23,10 +24,15 @@ class ChatGroupSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["creator", "created_at"]
 
+    # Querysets from community.utils.annotate_groups carry both values already
     def get_member_count(self, obj):
+        if hasattr(obj, "num_members"):
+            return obj.num_members
         return obj.memberships.count()
 
     def get_is_member(self, obj):
+        if hasattr(obj, "caller_is_member"):
+            return obj.caller_is_member
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return obj.memberships.filter(user=request.user).exists()
@@ -42,6 +48,19 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ["sender", "group", "timestamp"]
 
 
+class MessageSearchSerializer(MessageSerializer):
+    """Search hit: the message plus its group, rank and highlighted snippet."""
+    group_name = serializers.CharField(source="group.name", read_only=True)
+    rank = serializers.FloatField(read_only=True)
+    highlight = serializers.SerializerMethodField()
+
+    class Meta(MessageSerializer.Meta):
+        fields = MessageSerializer.Meta.fields + ["group_name", "rank", "highlight"]
+
+    def get_highlight(self, obj):
+        return render_headline(obj.headline)
+
+
 class MembershipSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source="user.username", read_only=True)
 
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import ChatGroup, Membership
+from .utils import invalidate_group_directory, notify_room
+
+
+@receiver(post_save, sender=ChatGroup)
+@receiver(post_delete, sender=ChatGroup)
+@receiver(post_delete, sender=Membership)
+def group_directory_changed(sender, instance, **kwargs):
+    invalidate_group_directory()
+
+
+@receiver(post_save, sender=Membership)
+def group_directory_joined(sender, instance, created, **kwargs):
+    # The directory only carries member counts; role or read-marker saves
+    # leave it valid
+    if created:
+        invalidate_group_directory()
+
+
+# ── Keep open chat connections in sync (see ChatConsumer) ──
+@receiver(post_save, sender=Membership)
+def membership_saved(sender, instance, **kwargs):
+    event = {"type": "membership_changed", "user_id": instance.user_id, "role": instance.role}
+    transaction.on_commit(lambda: notify_room(instance.group_id, event))
+
+
+@receiver(post_delete, sender=Membership)
+def membership_deleted(sender, instance, **kwargs):
+    event = {"type": "membership_changed", "user_id": instance.user_id, "role": None}
+    transaction.on_commit(lambda: notify_room(instance.group_id, event))
+
+
+@receiver(post_save, sender=ChatGroup)
+def group_saved(sender, instance, created, **kwargs):
+    if created:
+        return
+    event = {"type": "group_changed", "is_announcement": instance.is_announcement}
+    transaction.on_commit(lambda: notify_room(instance.id, event))
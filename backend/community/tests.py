@@ -1,3 +1,477 @@
-from django.test import TestCase
+import unittest
+from unittest import mock
+from urllib.parse import urlsplit
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import buffer, presence, search, views
+from .models import ChatGroup, Membership, Message
+from .routing import websocket_urlpatterns
+from .utils import GROUP_DIRECTORY_KEY, chat_room, get_group_directory, mark_read
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+IN_MEMORY_LAYER = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "exercises the SQLite FTS5 search path")
+class MessageSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.user)
+        self.other = ChatGroup.objects.create(name="Hydro", creator=self.user)
+        Membership.objects.create(user=self.user, group=self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, *contents, group=None):
+        return Message.objects.bulk_create(
+            Message(group=group or self.group, sender=self.user, content=content) for content in contents
+        )
+
+    def search(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_better_matches_rank_first(self):
+        weak, strong, _ = self.post(
+            "Quarterly results are out, dividend talk later in a long thread about banks and hydro",
+            "Dividend dividend: NABIL dividend announced",
+            "Nothing relevant here",
+        )
+
+        results = self.search("/api/community/messages/search/?q=dividend")["results"]
+
+        self.assertEqual([r["id"] for r in results], [strong.id, weak.id])
+        self.assertGreater(results[0]["rank"], results[1]["rank"])
+        self.assertIn("<mark>", results[0]["highlight"])
+
+    def test_only_member_groups_are_searched(self):
+        self.post("bonus shares in banking")
+        self.post("bonus shares in hydro", group=self.other)
+
+        results = self.search("/api/community/messages/search/?q=bonus")["results"]
+
+        self.assertEqual([r["group_name"] for r in results], ["Banking"])
+
+    def test_cursor_pages_through_tied_ranks(self):
+        messages = self.post(*["right share issue"] * 25)
+
+        seen, url = [], "/api/community/messages/search/?q=right+share&page_size=10"
+        while url:
+            data = self.search(url)
+            seen += [r["id"] for r in data["results"]]
+            url = data["next"] and "?".join(filter(None, urlsplit(data["next"])[2:4]))
+
+        self.assertEqual(seen, sorted((m.id for m in messages), reverse=True))
+
+    def test_operators_and_markup_are_treated_as_text(self):
+        self.post("<b>IPO</b> opens tomorrow")
+
+        results = self.search("/api/community/messages/search/?q=%22IPO*+(")["results"]
+
+        self.assertEqual(len(results), 1)
+        self.assertIn("&lt;b&gt;<mark>IPO</mark>&lt;/b&gt;", results[0]["highlight"])
+        self.assertEqual(self.search("/api/community/messages/search/?q=%22(*")["results"], [])
+
+
+class SearchTestMixin:
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.user)
+        Membership.objects.create(user=self.user, group=self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, *contents):
+        return Message.objects.bulk_create(
+            Message(group=self.group, sender=self.user, content=content) for content in contents
+        )
+
+    def search(self, text):
+        response = self.client.get("/api/community/messages/search/", {"q": text})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "exercises the tsvector trigger and GIN index")
+class PostgresMessageSearchTests(SearchTestMixin, TestCase):
+    def test_trigger_indexes_new_and_edited_messages(self):
+        weak, strong = self.post("dividend talk about banks", "Dividends: NABIL declares a dividend")
+
+        results = self.search("dividend")
+        self.assertEqual([r["id"] for r in results], [strong.id, weak.id])
+        self.assertIn("<mark>", results[0]["highlight"])
+
+        Message.objects.filter(id=weak.id).update(content="bonus shares instead")
+        self.assertEqual([r["id"] for r in self.search("dividend")], [strong.id])
+        self.assertEqual([r["id"] for r in self.search("bonus")], [weak.id])
+
+    def test_websearch_syntax(self):
+        both, only_bonus = self.post("bonus and dividend", "bonus only")
+
+        self.assertEqual([r["id"] for r in self.search("bonus -dividend")], [only_bonus.id])
+        self.assertEqual([r["id"] for r in self.search('"bonus and dividend"')], [both.id])
+
+
+class FallbackMessageSearchTests(SearchTestMixin, TestCase):
+    def test_other_databases_use_a_substring_match(self):
+        _, match, other = self.post("IPO opens", "<b>IPO</b> opens tomorrow", "tomorrow only")
+
+        with mock.patch.object(search.connection, "vendor", "mysql"):
+            results = self.search("ipo tomorrow")
+
+        self.assertEqual([r["id"] for r in results], [match.id])
+        self.assertEqual(results[0]["highlight"], "&lt;b&gt;IPO&lt;/b&gt; opens tomorrow")
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class GroupDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.user)
+
+    def member_count(self):
+        return next(g["member_count"] for g in get_group_directory() if g["id"] == self.group.id)
+
+    def test_joining_and_leaving_refresh_member_counts(self):
+        self.assertEqual(self.member_count(), 0)
+
+        membership = Membership.objects.create(user=self.user, group=self.group)
+        self.assertEqual(self.member_count(), 1)
+
+        membership.delete()
+        self.assertEqual(self.member_count(), 0)
+
+    def test_role_change_keeps_the_cached_directory(self):
+        membership = Membership.objects.create(user=self.user, group=self.group)
+        get_group_directory()
+
+        membership.role = "admin"
+        membership.save()
+
+        self.assertIsNotNone(cache.get(GROUP_DIRECTORY_KEY))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.member_count(), 1)
+
+    def test_group_changes_refresh_the_directory(self):
+        get_group_directory()
+        self.group.name = "Banks"
+        self.group.save()
+
+        self.assertEqual(get_group_directory()[0]["name"], "Banks")
+
+
+@override_settings(COMMUNITY_CHAT_BUFFER_WINDOW=0.001)
+class GroupMessageBufferTests(TransactionTestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.alice)
+        self.layer = InMemoryChannelLayer()
+
+    def run_buffer(self, messages, **patches):
+        """Buffers (sender, content, client_id) tuples and returns every frame sent."""
+        async def run():
+            room = await self.layer.new_channel()
+            await self.layer.group_add(chat_room(self.group.id), room)
+            channels = {user: await self.layer.new_channel() for user in (self.alice, self.bob)}
+
+            buf = buffer.GroupMessageBuffer(self.group.id, self.layer)
+            buf.__dict__.update(patches)
+            for user, content, client_id in messages:
+                buf.add(user, content, channels[user], client_id)
+            await buf.task
+
+            async def drain(channel):
+                frames = []
+                while self.layer.channels.get(channel):
+                    frames.append(await self.layer.receive(channel))
+                return frames
+
+            return await drain(room), {user.username: await drain(c) for user, c in channels.items()}
+        return async_to_sync(run)()
+
+    def test_batches_keep_arrival_order(self):
+        sent = [(self.alice if i % 2 else self.bob, f"m{i}", None) for i in range(5)]
+
+        with mock.patch.object(buffer, "MAX_BATCH_SIZE", 2):
+            room, _ = self.run_buffer(sent)
+
+        self.assertEqual([len(f["messages"]) for f in room], [2, 2, 1])
+        contents = [m["message"] for f in room for m in f["messages"]]
+        self.assertEqual(contents, [f"m{i}" for i in range(5)])
+        self.assertEqual(list(Message.objects.order_by("id").values_list("content", flat=True)), contents)
+
+    def test_each_sender_gets_its_own_acks(self):
+        room, replies = self.run_buffer([
+            (self.alice, "hi", "a1"), (self.bob, "hello", "b1"), (self.alice, "again", "a2"),
+            (self.bob, "no ack wanted", None),
+        ])
+
+        ids = {m["message"]: m["id"] for m in room[0]["messages"]}
+        self.assertEqual(replies["alice"], [{"type": "chat_ack", "acks": [
+            {"client_id": "a1", "id": ids["hi"], "timestamp": mock.ANY},
+            {"client_id": "a2", "id": ids["again"], "timestamp": mock.ANY},
+        ]}])
+        self.assertEqual([a["client_id"] for a in replies["bob"][0]["acks"]], ["b1"])
+
+    def test_failed_save_rejects_the_batch(self):
+        async def broken_save(batch):
+            raise RuntimeError("database down")
+
+        room, replies = self.run_buffer([(self.alice, "hi", "a1"), (self.bob, "yo", "b1")], save=broken_save)
+
+        self.assertEqual(room, [])
+        self.assertEqual([f["type"] for f in replies["alice"] + replies["bob"]], ["chat_error", "chat_error"])
+
+    def test_failed_broadcast_still_acks_stored_messages(self):
+        with mock.patch.object(self.layer, "group_send", side_effect=RuntimeError("layer down")):
+            room, replies = self.run_buffer([(self.alice, "hi", "a1")])
+
+        self.assertEqual(room, [])
+        self.assertEqual([f["type"] for f in replies["alice"]], ["chat_ack"])
+        self.assertEqual(Message.objects.get().content, "hi")
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachePresenceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.registry = presence.CachePresence()
+        self.user = User.objects.create_user("alice")
+        self.other = User.objects.create_user("bob")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.user)
+        Membership.objects.create(user=self.user, group=self.group)
+        patcher = mock.patch.object(presence, "_registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_the_first_connection_joins_and_the_last_leaves(self):
+        self.assertTrue(self.registry.touch(self.group.id, "c1", self.user.id))
+        self.assertFalse(self.registry.touch(self.group.id, "c2", self.user.id))
+        # A heartbeat on an open connection is not a new join either
+        self.assertFalse(self.registry.touch(self.group.id, "c1", self.user.id))
+
+        self.assertFalse(self.registry.leave(self.group.id, "c1", self.user.id))
+        self.assertEqual(self.registry.online(self.group.id), [self.user.id])
+        self.assertTrue(self.registry.leave(self.group.id, "c2", self.user.id))
+        self.assertEqual(self.registry.online(self.group.id), [])
+
+    def test_connections_expire_without_heartbeats(self):
+        now = presence.time.time()
+        self.registry.touch(self.group.id, "c1", self.user.id)
+        self.registry.touch(self.group.id, "c2", self.other.id)
+
+        with mock.patch.object(presence.time, "time", return_value=now + presence.PRESENCE_TTL / 2):
+            self.registry.touch(self.group.id, "c2", self.other.id)
+        with mock.patch.object(presence.time, "time", return_value=now + presence.PRESENCE_TTL + 1):
+            self.assertEqual(self.registry.online(self.group.id), [self.other.id])
+            # The expired connection is gone, so reconnecting counts as a join
+            self.assertTrue(self.registry.touch(self.group.id, "c3", self.user.id))
+
+    def test_online_members_endpoint(self):
+        self.registry.touch(self.group.id, "c1", self.user.id)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(f"/api/community/groups/{self.group.id}/online/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "count": 1,
+            "users": [{"id": self.user.id, "username": "alice"}],
+            "heartbeat_interval": presence.HEARTBEAT_INTERVAL,
+        })
+
+    def test_online_members_requires_membership(self):
+        client = APIClient()
+        client.force_authenticate(self.other)
+
+        self.assertEqual(client.get(f"/api/community/groups/{self.group.id}/online/").status_code, 403)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class ChatPresenceEventTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.alice)
+        for user in (self.alice, self.bob):
+            Membership.objects.create(user=user, group=self.group)
+        patcher = mock.patch.object(presence, "_registry", presence.CachePresence())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self, user):
+        return WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns),
+            f"/ws/chat/{self.group.id}/?token={AccessToken.for_user(user)}",
+        )
+
+    def test_join_and_leave_are_sent_once_per_user(self):
+        async def run():
+            bob = self.connect(self.bob)
+            await bob.connect()
+            self.assertEqual((await bob.receive_json_from())["username"], "bob")
+
+            first, second = self.connect(self.alice), self.connect(self.alice)
+            await first.connect()
+            self.assertEqual(await bob.receive_json_from(), {"type": "user_event", "event": "joined", "username": "alice"})
+            await second.connect()
+            await second.disconnect()
+            self.assertTrue(await bob.receive_nothing())
+
+            await first.disconnect()
+            self.assertEqual(await bob.receive_json_from(), {"type": "user_event", "event": "left", "username": "alice"})
+            await bob.disconnect()
+        async_to_sync(run)()
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ReadMarkerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.alice)
+        self.membership = Membership.objects.create(user=self.alice, group=self.group)
+        Membership.objects.create(user=self.bob, group=self.group)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def post(self, sender, count):
+        return [
+            Message.objects.create(group=self.group, sender=sender, content=f"m{i}").id
+            for i in range(count)
+        ]
+
+    def marker(self):
+        self.membership.refresh_from_db()
+        return self.membership.last_read_message_id
+
+    def unread(self):
+        groups = self.client.get("/api/community/my-groups/").json()
+        return next(g["unread"] for g in groups if g["id"] == self.group.id)
+
+    def test_marker_moves_forward_only(self):
+        ids = self.post(self.bob, 3)
+
+        self.assertEqual(mark_read(self.alice.id, self.group.id, ids[1]), ids[1])
+        self.assertIsNone(mark_read(self.alice.id, self.group.id, ids[0]))
+        self.assertEqual(self.marker(), ids[1])
+        # Without an id, and past the newest message, it stops at the newest
+        self.assertEqual(mark_read(self.alice.id, self.group.id), ids[2])
+        self.assertIsNone(mark_read(self.alice.id, self.group.id, ids[2] + 100))
+
+    def test_no_message_at_or_below_the_id_leaves_the_marker_alone(self):
+        self.assertIsNone(mark_read(self.alice.id, self.group.id))
+        ids = self.post(self.bob, 2)
+
+        # Only the existence check runs; no UPDATE writes a NULL marker
+        with self.assertNumQueries(1):
+            self.assertIsNone(mark_read(self.alice.id, self.group.id, ids[0] - 1))
+        self.assertIsNone(self.marker())
+
+    def test_unread_counts_skip_own_messages(self):
+        self.post(self.alice, 2)
+        ids = self.post(self.bob, 3)
+        self.assertEqual(self.unread(), 3)
+
+        mark_read(self.alice.id, self.group.id, ids[0])
+        self.assertEqual(self.unread(), 2)
+        mark_read(self.alice.id, self.group.id)
+        self.assertEqual(self.unread(), 0)
+
+    def test_unread_counts_take_one_query_for_every_group(self):
+        for i in range(5):
+            group = ChatGroup.objects.create(name=f"g{i}", creator=self.bob)
+            Membership.objects.create(user=self.alice, group=group)
+            Message.objects.create(group=group, sender=self.bob, content="hi")
+        self.client.get("/api/community/my-groups/")
+
+        # One membership query with the counts; the directory is cached
+        with self.assertNumQueries(1):
+            groups = self.client.get("/api/community/my-groups/").json()
+        self.assertEqual(sorted(g["unread"] for g in groups), [0, 1, 1, 1, 1, 1])
+
+    def test_mark_group_read_endpoint(self):
+        ids = self.post(self.bob, 2)
+        url = f"/api/community/groups/{self.group.id}/read/"
+
+        with mock.patch.object(views, "notify_read") as notify:
+            first = self.client.post(url, {"message_id": ids[0]}, format="json").json()
+            again = self.client.post(url, {"message_id": ids[0]}, format="json").json()
+
+        self.assertEqual(first, {"last_read_message_id": ids[0], "updated": True})
+        self.assertEqual(again, {"last_read_message_id": None, "updated": False})
+        notify.assert_called_once_with(self.group.id, self.alice, ids[0])
+        self.assertEqual(self.client.post(url, {"message_id": "x"}, format="json").status_code, 400)
+
+    def test_mark_group_read_requires_membership(self):
+        other = ChatGroup.objects.create(name="Hydro", creator=self.bob)
+
+        response = self.client.post(f"/api/community/groups/{other.id}/read/", {}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CHANNEL_LAYERS=IN_MEMORY_LAYER)
+class ReadReceiptSocketTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.group = ChatGroup.objects.create(name="Banking", creator=self.alice)
+        for user in (self.alice, self.bob):
+            Membership.objects.create(user=user, group=self.group)
+        self.message = Message.objects.create(group=self.group, sender=self.bob, content="hi")
+        patcher = mock.patch.object(presence, "_registry", presence.CachePresence())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_read_event_moves_the_marker_and_notifies_the_room(self):
+        async def run():
+            sockets = {}
+            for user in (self.bob, self.alice):
+                sockets[user.username] = WebsocketCommunicator(
+                    URLRouter(websocket_urlpatterns),
+                    f"/ws/chat/{self.group.id}/?token={AccessToken.for_user(user)}",
+                )
+                await sockets[user.username].connect()
+            # Join events: bob sees both, alice only her own
+            for _ in range(2):
+                await sockets["bob"].receive_json_from()
+            await sockets["alice"].receive_json_from()
+
+            await sockets["alice"].send_json_to({"type": "read"})
+            receipt = await sockets["bob"].receive_json_from()
+            # Re-reading the same message changes nothing and sends nothing
+            await sockets["alice"].send_json_to({"type": "read", "message_id": self.message.id})
+            await sockets["alice"].send_json_to({"type": "read", "message_id": "x"})
+            await sockets["alice"].receive_json_from()
+            quiet = await sockets["bob"].receive_nothing()
+
+            for socket in sockets.values():
+                await socket.disconnect()
+            return receipt, quiet
+
+        receipt, quiet = async_to_sync(run)()
+
+        self.assertEqual(receipt, {
+            "type": "read", "user_id": self.alice.id, "username": "alice", "message_id": self.message.id,
+        })
+        self.assertTrue(quiet)
+        self.assertEqual(Membership.objects.get(user=self.alice).last_read_message_id, self.message.id)
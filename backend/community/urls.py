@@ -7,6 +7,9 @@ urlpatterns = [
     path("groups/<int:group_id>/join/", views.join_group, name="join_group"),
     path("groups/<int:group_id>/leave/", views.leave_group, name="leave_group"),
     path("groups/<int:group_id>/messages/", views.message_history, name="message_history"),
+    path("groups/<int:group_id>/online/", views.online_members, name="online_members"),
+    path("groups/<int:group_id>/read/", views.mark_group_read, name="mark_group_read"),
     path("my-groups/", views.my_groups, name="my_groups"),
+    path("messages/search/", views.message_search, name="message_search"),
     path("messages/<int:message_id>/delete/", views.delete_message, name="delete_message"),
 ]
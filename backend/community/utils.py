@@ -0,0 +1,152 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db.models import Count, Exists, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from .models import ChatGroup, Membership, Message
+
+# Channel-layer group shared by every WebSocket connected to a chat group
+ROOM_PREFIX = "chat_"
+
+# Serialized list of every group with its member count, shared by all users.
+# Dropped by community.signals whenever a group or membership changes.
+GROUP_DIRECTORY_KEY = "community:groups"
+GROUP_DIRECTORY_TIMEOUT = 60 * 60
+
+
+def annotate_groups(queryset, user=None):
+    """
+    Adds the creator, the member count and (for `user`) membership to a
+    ChatGroup queryset so ChatGroupSerializer needs no query per group.
+    """
+    # Meta.ordering is not applied to aggregate queries, so it is restated
+    queryset = (
+        queryset.select_related("creator")
+        .annotate(num_members=Count("memberships"))
+        .order_by(*ChatGroup._meta.ordering)
+    )
+    if user is not None:
+        queryset = queryset.annotate(
+            caller_is_member=Exists(Membership.objects.filter(group=OuterRef("pk"), user=user))
+        )
+    return queryset
+
+
+def get_group_directory():
+    """Returns the cached group directory, rebuilding it with one query on a miss."""
+    from .serializers import ChatGroupSerializer
+
+    directory = cache.get(GROUP_DIRECTORY_KEY)
+    if directory is None:
+        groups = annotate_groups(ChatGroup.objects.all())
+        directory = [
+            {key: value for key, value in group.items() if key != "is_member"}
+            for group in ChatGroupSerializer(groups, many=True).data
+        ]
+        cache.set(GROUP_DIRECTORY_KEY, directory, GROUP_DIRECTORY_TIMEOUT)
+    return directory
+
+
+def invalidate_group_directory():
+    cache.delete(GROUP_DIRECTORY_KEY)
+
+
+def unread_count():
+    """
+    Subquery counting messages from others after a membership's last read
+    message, as an index range scan on Message (group, id).
+    """
+    unread = (
+        Message.objects.filter(
+            group=OuterRef("group"),
+            id__gt=Coalesce(OuterRef("last_read_message_id"), Value(0)),
+        )
+        .exclude(sender=OuterRef("user"))
+        .order_by().values("group").annotate(count=Count("id")).values("count")
+    )
+    return Coalesce(Subquery(unread, output_field=IntegerField()), Value(0))
+
+
+def list_groups(user, joined_only=False, with_unread=False):
+    """
+    Directory entries with `is_member` filled in for `user` from a single
+    membership query. With joined_only, only the user's own groups are kept,
+    most recently joined first. With with_unread, joined groups also carry
+    their `unread` count and `last_read_message_id` from that same query.
+    """
+    memberships = Membership.objects.filter(user=user)
+    if with_unread:
+        memberships = memberships.annotate(unread=unread_count())
+        rows = list(memberships.values_list("group_id", "unread", "last_read_message_id"))
+    else:
+        rows = [(group_id, None, None) for group_id in memberships.values_list("group_id", flat=True)]
+
+    joined = [group_id for group_id, _, _ in rows]
+    groups = {
+        group["id"]: {**group, "is_member": False}
+        for group in get_group_directory()
+    }
+    for group_id, unread, last_read in rows:
+        if group_id in groups:
+            groups[group_id]["is_member"] = True
+            if with_unread:
+                groups[group_id]["unread"] = unread
+                groups[group_id]["last_read_message_id"] = last_read
+
+    if joined_only:
+        return [groups[group_id] for group_id in joined if group_id in groups]
+    return list(groups.values())
+
+
+def mark_read(user_id, group_id, message_id=None):
+    """
+    Moves the user's read marker in a group forward to `message_id` (or to
+    the newest message), in one UPDATE. The marker never moves backwards and
+    never past the newest message. Returns the new message id, or None if
+    nothing changed.
+    """
+    newest = Message.objects.filter(group_id=group_id)
+    if message_id is not None:
+        newest = newest.filter(id__lte=message_id)
+    newest = newest.order_by("-id").values("id")[:1]
+    # Nothing at or below message_id: a NULL marker would reset a fresh membership
+    if not newest.exists():
+        return None
+
+    marker = Subquery(newest)
+    updated = (
+        Membership.objects.filter(user_id=user_id, group_id=group_id)
+        .filter(Q(last_read_message_id__isnull=True) | Q(last_read_message_id__lt=marker))
+        .update(last_read_message_id=marker)
+    )
+    if not updated:
+        return None
+    return (
+        Membership.objects.filter(user_id=user_id, group_id=group_id)
+        .values_list("last_read_message_id", flat=True).first()
+    )
+
+
+def chat_room(group_id):
+    return f"{ROOM_PREFIX}{group_id}"
+
+
+def notify_room(group_id, event):
+    """
+    Pushes a state-change event (e.g. "membership_changed") to every
+    ChatConsumer connected to the group, so they can update cached state.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(chat_room(group_id), event)
+
+
+def notify_read(group_id, user, message_id):
+    """Read receipt for everyone connected to the group."""
+    notify_room(group_id, {
+        "type": "read_receipt",
+        "user_id": user.id,
+        "username": user.username,
+        "message_id": message_id,
+    })
@@ -2,15 +2,85 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from investo_backend.pagination import KeysetPagination
 from .models import ChatGroup, Membership, Message
-from .serializers import ChatGroupSerializer, MessageSerializer, MembershipSerializer
+from .search import search_messages
+from .serializers import ChatGroupSerializer, MessageSerializer, MessageSearchSerializer, MembershipSerializer
+from .presence import HEARTBEAT_INTERVAL, get_presence
+from .utils import annotate_groups, list_groups, mark_read, notify_read
 
 
-class MessagePagination(PageNumberPagination):
+class MessagePagination(KeysetPagination):
+    """
+    Newest-first message pages that seek on (timestamp, id) through the
+    (group, timestamp) index, so any page of history costs the same and
+    new arrivals never shift page boundaries. No COUNT(*) is run.
+
+    ?before=<cursor> pages back into older history, ?after=<cursor> forward
+    to newer messages; results are newest first either way.
+    """
+    ordering = ("-timestamp", "-id")
     page_size = 50
-    page_size_query_param = "page_size"
     max_page_size = 100
+    before_query_param = "before"
+    after_query_param = "after"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        fields = [f.lstrip("-") for f in self.ordering]
+
+        before = params.get(self.before_query_param)
+        after = params.get(self.after_query_param)
+        # Newer messages are read oldest first from the cursor, then flipped
+        self.descending = not after
+        queryset = queryset.order_by(*(self.ordering if self.descending else fields))
+
+        cursor = after or before
+        try:
+            if cursor:
+                queryset = queryset.filter(self.seek(fields, self.decode_cursor(cursor, len(fields))))
+            rows = list(queryset[:self.page_size + 1])
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not self.descending:
+            rows.reverse()
+
+        self.older_key = self.newer_key = None
+        if rows:
+            if more or not self.descending:
+                self.older_key = [self.key_value(rows[-1], f) for f in fields]
+            if (more and not self.descending) or before:
+                self.newer_key = [self.key_value(rows[0], f) for f in fields]
+        return rows
+
+    def page_link(self, param, key):
+        if key is None:
+            return None
+        url = self.request.build_absolute_uri()
+        for other in (self.before_query_param, self.after_query_param):
+            url = remove_query_param(url, other)
+        return replace_query_param(url, param, self.encode_cursor(key))
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.page_link(self.before_query_param, self.older_key),
+            "previous": self.page_link(self.after_query_param, self.newer_key),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response["properties"]["previous"] = {"type": "string", "nullable": True}
+        return response
 
 
 # ────────────────────────────
@@ -20,9 +90,8 @@ class MessagePagination(PageNumberPagination):
 @permission_classes([IsAuthenticated])
 def group_list_create(request):
     if request.method == "GET":
-        groups = ChatGroup.objects.all()
-        serializer = ChatGroupSerializer(groups, many=True, context={"request": request})
-        return Response(serializer.data)
+        # Served from the cached directory; only membership is looked up per user
+        return Response(list_groups(request.user))
 
     elif request.method == "POST":
         serializer = ChatGroupSerializer(data=request.data, context={"request": request})
@@ -30,6 +99,7 @@ def group_list_create(request):
             group = serializer.save(creator=request.user)
             # Auto-join creator as admin
             Membership.objects.create(user=request.user, group=group, role="admin")
+            group = annotate_groups(ChatGroup.objects.filter(id=group.id), request.user).get()
             return Response(
                 ChatGroupSerializer(group, context={"request": request}).data,
                 status=status.HTTP_201_CREATED,
@@ -44,7 +114,7 @@ def group_list_create(request):
 @permission_classes([IsAuthenticated])
 def group_detail(request, group_id):
     try:
-        group = ChatGroup.objects.get(id=group_id)
+        group = annotate_groups(ChatGroup.objects.all(), request.user).get(id=group_id)
     except ChatGroup.DoesNotExist:
         return Response({"error": "Group not found"}, status=404)
 
@@ -65,8 +135,11 @@ def join_group(request, group_id):
     except ChatGroup.DoesNotExist:
         return Response({"error": "Group not found"}, status=404)
 
+    # Earlier history starts out read, so a new member's unread count is 0
+    newest = Message.objects.filter(group=group).order_by("-id").values_list("id", flat=True).first()
     membership, created = Membership.objects.get_or_create(
-        user=request.user, group=group, defaults={"role": "member"}
+        user=request.user, group=group,
+        defaults={"role": "member", "last_read_message_id": newest},
     )
     if not created:
         return Response({"message": "Already a member"}, status=200)
@@ -88,25 +161,41 @@ def leave_group(request, group_id):
     return Response({"message": "Left group"}, status=200)
 
 
+# ────────────────────────────
+# MARK READ
+# ────────────────────────────
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def mark_group_read(request, group_id):
+    message_id = request.data.get("message_id")
+    if message_id is not None:
+        try:
+            message_id = int(message_id)
+        except (TypeError, ValueError):
+            return Response({"error": "Invalid message_id"}, status=400)
+
+    if not Membership.objects.filter(user=request.user, group_id=group_id).exists():
+        return Response({"error": "Not a member"}, status=400)
+
+    last_read = mark_read(request.user.id, group_id, message_id)
+    if last_read is not None:
+        notify_read(group_id, request.user, last_read)
+    return Response({"last_read_message_id": last_read, "updated": last_read is not None})
+
+
 # ────────────────────────────
 # MY GROUPS
 # ────────────────────────────
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def my_groups(request):
-    if request.user.is_staff:
-        # Admins automatically see all groups in their sidebar
-        groups = ChatGroup.objects.all()
-    else:
-        memberships = Membership.objects.filter(user=request.user).select_related("group")
-        groups = [m.group for m in memberships]
-    
-    serializer = ChatGroupSerializer(groups, many=True, context={"request": request})
-    return Response(serializer.data)
+    # Admins automatically see all groups in their sidebar
+    groups = list_groups(request.user, joined_only=not request.user.is_staff, with_unread=True)
+    return Response(groups)
 
 
 # ────────────────────────────
-# MESSAGE HISTORY (paginated)
+# MESSAGE HISTORY (keyset paginated)
 # ────────────────────────────
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -116,7 +205,7 @@ def message_history(request, group_id):
         if not Membership.objects.filter(user=request.user, group_id=group_id).exists():
             return Response({"error": "Not a member of this group"}, status=403)
 
-    messages = Message.objects.filter(group_id=group_id).order_by("-timestamp")
+    messages = Message.objects.filter(group_id=group_id).select_related("sender")
 
     paginator = MessagePagination()
     page = paginator.paginate_queryset(messages, request)
@@ -124,6 +213,63 @@ def message_history(request, group_id):
     return paginator.get_paginated_response(serializer.data)
 
 
+class MessageSearchPagination(KeysetPagination):
+    """Best matches first; seeks on (rank, id) like the history pages."""
+    ordering = ("-rank", "-id")
+    page_size = 20
+    max_page_size = 100
+    opt_in = False
+
+
+# ────────────────────────────
+# MESSAGE SEARCH (full text, ranked)
+# ────────────────────────────
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def message_search(request):
+    text = request.query_params.get("q", "").strip()
+    if not text:
+        return Response({"error": "Search query (q) is required"}, status=400)
+
+    messages = Message.objects.select_related("sender", "group")
+    # Admins search everything, members only their own groups
+    if not request.user.is_staff:
+        messages = messages.filter(
+            group_id__in=Membership.objects.filter(user=request.user).values("group_id")
+        )
+
+    group_id = request.query_params.get("group")
+    if group_id:
+        if not group_id.isdigit():
+            return Response({"error": "Invalid group"}, status=400)
+        messages = messages.filter(group_id=group_id)
+
+    paginator = MessageSearchPagination()
+    page = paginator.paginate_queryset(search_messages(messages, text), request)
+    serializer = MessageSearchSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+# ────────────────────────────
+# ONLINE MEMBERS (presence registry)
+# ────────────────────────────
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def online_members(request, group_id):
+    # Admins can bypass membership check
+    if not request.user.is_staff:
+        if not Membership.objects.filter(user=request.user, group_id=group_id).exists():
+            return Response({"error": "Not a member of this group"}, status=403)
+
+    user_ids = get_presence().online(group_id)
+    users = User.objects.filter(id__in=user_ids).order_by("username").values("id", "username")
+    return Response({
+        "count": len(user_ids),
+        "users": list(users),
+        "heartbeat_interval": HEARTBEAT_INTERVAL,
+    })
+
+
 # ────────────────────────────
 # DELETE MESSAGE (admin only)
 # ────────────────────────────
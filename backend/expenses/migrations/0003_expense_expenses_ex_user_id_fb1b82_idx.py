@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_expense_category_alter_expense_type'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='expenses_ex_user_id_fb1b82_idx'),
+        ),
+    ]
@@ -24,5 +24,11 @@ class Expense(models.Model):
     description = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)  # Timestamp
 
+    class Meta:
+        indexes = [
+            # Keyset pagination and date-range filters seek on this per user
+            models.Index(fields=["user", "created_at", "id"]),
+        ]
+
     def __str__(self):
         return f"{self.type} - {self.amount} - {self.category}"
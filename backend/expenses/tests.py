@@ -1,3 +1,92 @@
+from datetime import datetime, timedelta
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from rest_framework.test import APIClient
+from .models import Expense
 
-# Create your tests here.
+
+class ExpenseKeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("saver")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        expenses = Expense.objects.bulk_create([
+            Expense(user=self.user, amount=i, type="expense", description=str(i))
+            for i in range(25)
+        ])
+        # Groups of four rows share a timestamp, so pages break inside ties
+        start = datetime(2026, 1, 1)
+        for i, expense in enumerate(expenses):
+            Expense.objects.filter(id=expense.id).update(created_at=start + timedelta(minutes=i // 4))
+
+    def walk(self, url):
+        ids = []
+        while url:
+            data = self.client.get(url).json()
+            ids += [row["id"] for row in data["results"]]
+            url = data["next"]
+        return ids
+
+    def test_pages_cover_every_row_once_in_order(self):
+        ids = self.walk("/api/expenses/?page_size=3")
+        expected = list(
+            Expense.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_without_paging_params_returns_plain_list(self):
+        data = self.client.get("/api/expenses/").json()
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 25)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get("/api/expenses/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+
+class ExpenseImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("importer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, content, name="expenses.csv"):
+        upload = SimpleUploadedFile(name, content)
+        return self.client.post("/api/expenses/import/", {"file": upload}, format="multipart")
+
+    def test_row_dates_are_kept(self):
+        response = self.upload(
+            b"amount,type,category,description,created_at\n"
+            b"10,expense,food,lunch,2020-01-01\n"
+            b"20,income,salary,pay,2021-06-30T09:15:00\n"
+            b"30,expense,misc,no date,\n"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["imported"], 3)
+        dates = dict(Expense.objects.values_list("description", "created_at"))
+        self.assertEqual(dates["lunch"], datetime(2020, 1, 1))
+        self.assertEqual(dates["pay"], datetime(2021, 6, 30, 9, 15))
+        self.assertGreater(dates["no date"], datetime(2026, 1, 1))
+
+    def test_invalid_date_is_reported_per_row(self):
+        response = self.upload(
+            b"amount,type,description,date\n10,expense,ok,2020-01-01\n5,expense,bad,01/02/2020\n"
+        )
+        data = response.json()
+        self.assertEqual((data["imported"], data["failed"]), (1, 1))
+        self.assertEqual(data["errors"][0]["line"], 3)
+
+    def test_export_import_round_trip_keeps_dates(self):
+        self.upload(b"amount,type,description,created_at\n10,expense,old,2019-05-04T08:00:00\n")
+        exported = b"".join(self.client.get("/api/expenses/export/").streaming_content)
+        Expense.objects.all().delete()
+        self.upload(exported)
+        self.assertEqual(Expense.objects.get().created_at, datetime(2019, 5, 4, 8))
+
+    def test_undecodable_file_is_400(self):
+        response = self.upload("amount,type,description\n10,expense,caf\u00e9\n".encode("latin-1"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line", response.json())
+        self.assertFalse(Expense.objects.exists())
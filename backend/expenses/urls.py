@@ -1,7 +1,16 @@
 from django.urls import path
-from .views import ExpenseListCreateView, ExpenseDeleteUpdateView
+from .views import (
+    ExpenseListCreateView,
+    ExpenseDeleteUpdateView,
+    ExpenseSummaryView,
+    ExpenseImportView,
+    ExpenseExportView,
+)
 
 urlpatterns = [
     path("", ExpenseListCreateView.as_view()),
+    path("summary/", ExpenseSummaryView.as_view()),
+    path("import/", ExpenseImportView.as_view()),
+    path("export/", ExpenseExportView.as_view()),
     path("<int:pk>/", ExpenseDeleteUpdateView.as_view()),
 ]
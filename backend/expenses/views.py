@@ -1,13 +1,65 @@
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from investo_backend.pagination import KeysetPagination
 from .models import Expense
 from .serializers import ExpenseSerializer
 
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 50
+EXPORT_FIELDS = ["id", "amount", "type", "category", "description", "created_at"]
+
+PERIODS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+def filter_date_range(expenses, params):
+    """Applies ?from=/?to= (YYYY-MM-DD, inclusive) on the raw created_at column."""
+    for param, lookup, shift in (("from", "created_at__gte", 0), ("to", "created_at__lt", 1)):
+        raw = params.get(param)
+        if not raw:
+            continue
+        try:
+            day = parse_date(raw)
+        except ValueError:
+            day = None
+        if day is None:
+            raise ValidationError({param: "Invalid date, use YYYY-MM-DD"})
+        expenses = expenses.filter(**{lookup: datetime.combine(day + timedelta(days=shift), time.min)})
+    return expenses
+
+class ExpensePagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
 class ExpenseListCreateView(generics.ListCreateAPIView):
+    """Full list by default; ?page_size=/&cursor= switch to keyset pages."""
     serializer_class = ExpenseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ExpensePagination
 
     def get_queryset(self):
-        return Expense.objects.filter(user=self.request.user).order_by("-id")
+        expenses = Expense.objects.filter(user=self.request.user)
+        params = self.request.query_params
+        expenses = filter_date_range(expenses, params)
+        if params.get("type"):
+            expenses = expenses.filter(type=params["type"])
+        if params.get("category"):
+            expenses = expenses.filter(category=params["category"])
+        return expenses.order_by("-created_at", "-id")
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -16,3 +68,182 @@ class ExpenseDeleteUpdateView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ExpenseSerializer
     permission_classes = [permissions.IsAuthenticated]
     queryset = Expense.objects.all()
+
+class ExpenseSummaryView(APIView):
+    """Totals by period, type and category: ?period=month&from=YYYY-MM-DD&to=YYYY-MM-DD"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        period = request.query_params.get("period", "month")
+        if period not in PERIODS:
+            return Response({"error": "period must be day, week or month"}, status=400)
+
+        expenses = filter_date_range(Expense.objects.filter(user=request.user), request.query_params)
+
+        rows = (
+            expenses.annotate(period=PERIODS[period]("created_at"))
+            .values("period", "type", "category")
+            .annotate(total=Sum("amount"), count=Count("id"))
+            .order_by("period", "type", "category")
+        )
+
+        totals = {value: 0 for value, _ in Expense.TYPE_CHOICES}
+        buckets = []
+        for row in rows:
+            totals[row["type"]] = totals.get(row["type"], 0) + row["total"]
+            buckets.append({
+                "period": row["period"].date().isoformat(),
+                "type": row["type"],
+                "category": row["category"],
+                "total": row["total"],
+                "count": row["count"],
+            })
+
+        return Response({
+            "period": period,
+            "totals": totals,
+            "balance": totals["income"] - totals["expense"] - totals["saving"],
+            "rows": buckets,
+        })
+
+class ExpenseImportView(APIView):
+    """
+    POST a CSV or JSON Lines file as 'file' (columns: amount, type, category,
+    description, optional created_at or date). Rows are validated with
+    ExpenseSerializer one chunk at a time and saved with bulk_create; invalid
+    rows are skipped and reported.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "No file uploaded"}, status=400)
+
+        file_format = request.query_params.get("file_format") or (
+            "jsonl" if upload.name.lower().endswith((".jsonl", ".ndjson")) else "csv"
+        )
+        if file_format not in ("csv", "jsonl"):
+            return Response({"error": "file_format must be csv or jsonl"}, status=400)
+
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        rows = csv.DictReader(lines) if file_format == "csv" else self.read_jsonl(lines)
+
+        # One serializer instance validates every row, without re-binding fields
+        validator = ExpenseSerializer()
+        imported, failed, errors, batch = 0, 0, [], []
+        line = 1 if file_format == "csv" else 0
+
+        try:
+            with transaction.atomic():
+                for line, row in enumerate(rows, start=line + 1):
+                    try:
+                        if isinstance(row, Exception):
+                            raise ValidationError({"row": str(row)})
+                        created_at = self.parse_created_at(row)
+                        batch.append((Expense(user=request.user, **validator.run_validation(row)), created_at))
+                    except ValidationError as e:
+                        failed += 1
+                        if len(errors) < MAX_REPORTED_ERRORS:
+                            errors.append({"line": line, "errors": e.detail})
+
+                    if len(batch) >= IMPORT_CHUNK_SIZE:
+                        imported += self.save_batch(batch)
+                        batch = []
+
+                if batch:
+                    imported += self.save_batch(batch)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Nothing is kept from a file that cannot be read to the end
+            return Response({"error": f"Could not read line {line + 1}: {e}", "line": line + 1}, status=400)
+
+        return Response({"imported": imported, "failed": failed, "errors": errors}, status=201)
+
+    @staticmethod
+    def parse_created_at(row):
+        """The row's created_at (or date) column as a datetime, or None if absent."""
+        raw = row.get("created_at") or row.get("date")
+        if not raw:
+            return None
+        raw = str(raw).strip()
+        try:
+            value = datetime.fromisoformat(raw)
+        except ValueError:
+            raise ValidationError({"created_at": "Invalid date, use YYYY-MM-DD or ISO 8601"})
+        # USE_TZ is off, so timestamps are stored naive in server time
+        if value.tzinfo is not None:
+            value = value.astimezone().replace(tzinfo=None)
+        return value
+
+    @staticmethod
+    def save_batch(batch):
+        """
+        bulk_create stamps created_at with the import time (auto_now_add), so
+        rows that carry their own date get it written back in one bulk_update.
+        """
+        expenses = Expense.objects.bulk_create([expense for expense, _ in batch])
+        dated = []
+        for expense, created_at in zip(expenses, (created_at for _, created_at in batch)):
+            if created_at is not None:
+                expense.created_at = created_at
+                dated.append(expense)
+        if dated:
+            Expense.objects.bulk_update(dated, ["created_at"], batch_size=IMPORT_CHUNK_SIZE)
+        return len(expenses)
+
+    @staticmethod
+    def read_jsonl(lines):
+        for text in lines:
+            if not text.strip():
+                continue
+            try:
+                row = json.loads(text)
+            except ValueError as e:
+                row = e
+            yield row if isinstance(row, (dict, Exception)) else ValueError("Expected a JSON object")
+
+class ExpenseExportView(APIView):
+    """Streams the ledger as CSV or JSON Lines: ?file_format=csv|jsonl plus list filters."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in ("csv", "jsonl"):
+            return Response({"error": "file_format must be csv or jsonl"}, status=400)
+
+        expenses = filter_date_range(Expense.objects.filter(user=request.user), request.query_params)
+        if request.query_params.get("type"):
+            expenses = expenses.filter(type=request.query_params["type"])
+        if request.query_params.get("category"):
+            expenses = expenses.filter(category=request.query_params["category"])
+
+        # Server-side cursor: rows are fetched and written a chunk at a time
+        rows = expenses.order_by("created_at", "id").values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        if file_format == "csv":
+            content, content_type = self.stream_csv(rows), "text/csv"
+        else:
+            content, content_type = self.stream_jsonl(rows), "application/x-ndjson"
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="expenses.{file_format}"'
+        return response
+
+    @staticmethod
+    def stream_csv(rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow(row[:-1] + (row[-1].isoformat(),))
+            if buffer.tell() > 64 * 1024:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    @staticmethod
+    def stream_jsonl(rows):
+        for row in rows:
+            yield json.dumps(dict(zip(EXPORT_FIELDS, row[:-1] + (row[-1].isoformat(),)))) + "\n"
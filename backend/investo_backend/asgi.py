@@ -18,11 +18,12 @@ django_asgi_app = get_asgi_application()
 
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.security.websocket import AllowedHostsOriginValidator
-from community.routing import websocket_urlpatterns
+from community.routing import websocket_urlpatterns as community_ws_urlpatterns
+from stocks.routing import websocket_urlpatterns as stocks_ws_urlpatterns
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(
-        URLRouter(websocket_urlpatterns)
+        URLRouter(community_ws_urlpatterns + stocks_ws_urlpatterns)
     ),
 })
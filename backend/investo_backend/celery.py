@@ -14,4 +14,35 @@ app.conf.beat_schedule = {
         'task': 'reminders.tasks.send_reminder_emails', # Points to reminders/tasks.py
         'schedule': crontab(minute='*'),
     },
-}
\ No newline at end of file
+    'flush-login-counts-every-minute': {
+        'task': 'admin_portal.tasks.flush_login_counts', # Points to admin_portal/tasks.py
+        'schedule': crontab(minute='*'),
+    },
+    'rollup-daily-usage-nightly': {
+        'task': 'admin_portal.tasks.rollup_daily_usage', # Points to admin_portal/tasks.py
+        'schedule': crontab(hour=0, minute=15),
+    },
+}
+
+# NEPSE feeds polled in the background, in seconds between refreshes.
+# Names must match stocks.utils.FEEDS.
+NEPSE_FEED_INTERVALS = {
+    'stocks': 15,
+    'depth': 15,
+    'gainers': 30,
+    'losers': 30,
+    'status': 60,
+    'summary': 60,
+    'sectors': 60,
+    'floorsheet': 60,
+    'news': 900,
+}
+
+app.conf.beat_schedule.update({
+    f'refresh-nepse-{name}': {
+        'task': 'stocks.tasks.refresh_feed', # Points to stocks/tasks.py
+        'schedule': interval,
+        'args': (name,),
+    }
+    for name, interval in NEPSE_FEED_INTERVALS.items()
+})
\ No newline at end of file
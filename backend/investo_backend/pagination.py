@@ -0,0 +1,110 @@
+import base64
+import json
+from datetime import date, datetime, time
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination that seeks on a composite key, e.g. (created_at, id),
+    instead of using OFFSET, so every page costs one indexed range read.
+
+    Opt-in by default: only requests carrying ?page_size= or ?cursor= are
+    paginated, everything else keeps the plain list response.
+    Subclasses set `ordering`; all fields must sort in the same direction
+    and the last one must be unique (normally the primary key).
+    """
+    ordering = ("-id",)
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+    opt_in = True
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.opt_in and self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        fields = [f.lstrip("-") for f in self.ordering]
+        self.descending = self.ordering[0].startswith("-")
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = params.get(self.cursor_query_param)
+        try:
+            if cursor:
+                queryset = queryset.filter(self.seek(fields, self.decode_cursor(cursor, len(fields))))
+            # One extra row tells us whether a next page exists, without COUNT(*)
+            rows = list(queryset[:self.page_size + 1])
+        except (ValidationError, TypeError, ValueError):
+            # Cursor values the columns cannot parse
+            raise NotFound(self.invalid_cursor_message)
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_key = [self.key_value(rows[-1], f) for f in fields] if rows else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def seek(self, fields, values):
+        """(a, b, c) > (x, y, z) spelled out for the ORM, in the page direction."""
+        op = "lt" if self.descending else "gt"
+        condition = Q()
+        for i, field in enumerate(fields):
+            step = Q(**{f"{field}__{op}": values[i]})
+            for prev_field, prev_value in zip(fields[:i], values[:i]):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition
+
+    def key_value(self, obj, field):
+        value = obj[field] if isinstance(obj, dict) else getattr(obj, field)
+        if isinstance(value, (date, datetime, time)):
+            return value.isoformat()
+        return value
+
+    def encode_cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor, length):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != length:
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_key))
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
@@ -144,6 +144,16 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_ENABLE_UTC = False # Use local time for scheduling
 
+# -------------------------
+# CACHE (shared by all workers, holds NEPSE feed snapshots)
+# -------------------------
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    }
+}
+
 # -------------------------
 # DJANGO CHANNELS CONFIG
 # -------------------------
@@ -154,4 +164,9 @@ CHANNEL_LAYERS = {
             "hosts": [("127.0.0.1", 6379)],
         },
     },
-}
\ No newline at end of file
+}
+
+# Community chat: when buffered, messages are collected per group for
+# COMMUNITY_CHAT_BUFFER_WINDOW seconds, then saved and broadcast as a batch
+COMMUNITY_CHAT_BUFFERED = False
+COMMUNITY_CHAT_BUFFER_WINDOW = 0.05
\ No newline at end of file
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class PortfolioManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portfolio_management'
+
+    def ready(self):
+        from stocks.signals import prices_ingested
+        from .utils import on_prices_ingested
+        from . import signals  # noqa: F401 (registers cache invalidation)
+
+        # Revalue holdings whenever a new price snapshot is ingested
+        prices_ingested.connect(on_prices_ingested, dispatch_uid="portfolio_revalue_holdings")
@@ -0,0 +1,33 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from portfolio_management.projection import simulate, summarize
+
+
+class Command(BaseCommand):
+    help = "Times the Monte Carlo portfolio projection on synthetic holdings."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--assets", type=int, default=25)
+        parser.add_argument("--paths", type=int, default=10000)
+        parser.add_argument("--years", type=int, default=30)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        count = options["assets"]
+        values = rng.uniform(1_000, 100_000, count)
+        volatilities = rng.uniform(0.05, 0.4, count)
+        drifts = np.log1p(rng.uniform(0.02, 0.15, count)) - volatilities ** 2 / 2
+        durations = rng.integers(1, options["years"] + 1, count)
+
+        timings = []
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            summarize(simulate(values, drifts, volatilities, durations, options["years"], options["paths"]))
+            timings.append(time.perf_counter() - start)
+
+        self.stdout.write(
+            f"{options['paths']} paths x {count} assets x {options['years']} years: "
+            f"best {min(timings) * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms"
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio_management', '0004_portfoliovaluation_holding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='portfolio',
+            index=models.Index(fields=['user', 'id'], name='portfolio_m_user_id_d2a1f6_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from stocks.models import Stock
 
 class Portfolio(models.Model):
 
@@ -13,6 +14,12 @@ class Portfolio(models.Model):
 
     roi = models.FloatField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination seeks on id per user
+            models.Index(fields=["user", "id"]),
+        ]
+
     def save(self, *args, **kwargs):
 
         # ROI calculation
@@ -24,4 +31,45 @@ class Portfolio(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return self.investment_name
\ No newline at end of file
+        return self.investment_name
+
+class Holding(models.Model):
+    """A position in a listed stock, valued from the latest ingested price."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="holdings")
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name="holdings")
+
+    quantity = models.FloatField()
+    average_cost = models.FloatField()
+
+    market_value = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ("user", "stock")
+
+    def save(self, *args, **kwargs):
+
+        # Mark to market, falling back to cost until the stock has a price
+        price = self.stock.last_traded_price
+        self.market_value = self.quantity * (price if price is not None else self.average_cost)
+
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.stock.symbol}"
+
+
+class PortfolioValuation(models.Model):
+    """Per-user holdings totals, recomputed in bulk after each price ingest."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="portfolio_valuation")
+
+    total_cost = models.FloatField(default=0)
+    market_value = models.FloatField(default=0)
+    profit_loss = models.FloatField(default=0)
+    roi = models.FloatField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.market_value}"
@@ -0,0 +1,116 @@
+import numpy as np
+from stocks.models import PriceHistory
+
+TRADING_DAYS = 252
+HISTORY_BARS = TRADING_DAYS * 3
+MIN_HISTORY_BARS = 20
+DEFAULT_VOLATILITY = 0.15
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Upper bound on random draws held in memory at once
+MAX_BATCH_DRAWS = 2_000_000
+
+
+def estimate_return_stats(symbols):
+    """
+    Annualised (log drift, volatility) per symbol from the last few years of
+    stored closes, loaded in one query. Symbols without enough history are omitted.
+    """
+    closes = {}
+    rows = (
+        PriceHistory.objects.filter(symbol__in=symbols)
+        .order_by("symbol", "date").values_list("symbol", "close")
+    )
+    for symbol, close in rows:
+        closes.setdefault(symbol, []).append(close)
+
+    stats = {}
+    for symbol, series in closes.items():
+        prices = np.asarray(series[-HISTORY_BARS:], dtype=float)
+        prices = prices[prices > 0]
+        if len(prices) < MIN_HISTORY_BARS:
+            continue
+        returns = np.diff(np.log(prices))
+        stats[symbol] = (
+            float(returns.mean() * TRADING_DAYS),
+            float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS)),
+        )
+    return stats
+
+
+def build_assets(entries, holdings, stats, horizon):
+    """
+    Turns Portfolio entries and stock holdings into simulation inputs.
+    Volatility comes from stored history where a symbol matches, otherwise
+    DEFAULT_VOLATILITY. Entries keep their stated expected return.
+    """
+    assets = []
+    for e in entries:
+        history = stats.get(e["investment_name"].upper())
+        sigma = history[1] if history else DEFAULT_VOLATILITY
+        expected = max(e["estimated_return_per_year"], -99) / 100
+        assets.append({
+            "name": e["investment_name"],
+            "value": e["investment_amount"],
+            # Log drift chosen so the mean annual return matches the estimate
+            "drift": float(np.log1p(expected)) - sigma ** 2 / 2,
+            "volatility": sigma,
+            "years": min(e["time_period"], horizon),
+            "volatility_source": "history" if history else "default",
+        })
+    for h in holdings:
+        history = stats.get(h["stock__symbol"])
+        sigma = history[1] if history else DEFAULT_VOLATILITY
+        assets.append({
+            "name": h["stock__symbol"],
+            "value": h["market_value"],
+            "drift": history[0] if history else -sigma ** 2 / 2,
+            "volatility": sigma,
+            "years": horizon,
+            "volatility_source": "history" if history else "default",
+        })
+
+    for a in assets:
+        a["expected_return"] = float(np.expm1(a["drift"] + a["volatility"] ** 2 / 2) * 100)
+    return assets
+
+
+def simulate(values, drifts, volatilities, durations, years, paths, seed=None):
+    """
+    Vectorised Monte Carlo of total portfolio value under annual GBM steps.
+
+    All assets of a batch of paths are drawn as one (paths, years, assets)
+    array; batches only bound memory for very large requests. Assets stop
+    growing once their own duration ends (e.g. a matured deposit).
+    Returns the total value at years 0..years for each path.
+    """
+    values = np.asarray(values, dtype=float)
+    drifts = np.asarray(drifts, dtype=float)
+    volatilities = np.asarray(volatilities, dtype=float)
+    durations = np.asarray(durations, dtype=float)
+
+    rng = np.random.default_rng(seed)
+    active = np.arange(years)[:, None] < durations[None, :]
+
+    totals = np.empty((paths, years + 1))
+    totals[:, 0] = values.sum()
+
+    batch = max(1, MAX_BATCH_DRAWS // max(1, years * len(values)))
+    for start in range(0, paths, batch):
+        count = min(batch, paths - start)
+        shocks = rng.standard_normal((count, years, len(values)))
+        cumulative = np.cumsum((drifts + volatilities * shocks) * active, axis=1)
+        totals[start:start + count, 1:] = (values * np.exp(cumulative)).sum(axis=2)
+    return totals
+
+
+def summarize(totals):
+    """Percentile bands and mean of simulated totals per year."""
+    bands = np.percentile(totals, PERCENTILES, axis=0)
+    return {
+        "percentiles": {
+            f"p{p}": [round(float(v), 2) for v in band]
+            for p, band in zip(PERCENTILES, bands)
+        },
+        "expected": [round(float(v), 2) for v in totals.mean(axis=0)],
+    }
@@ -1,9 +1,47 @@
 from rest_framework import serializers
-from .models import Portfolio
+from stocks.models import Stock
+from .models import Portfolio, Holding
 
 class PortfolioSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Portfolio
         fields = "__all__"
-        read_only_fields = ["user", "roi"]
\ No newline at end of file
+        read_only_fields = ["user", "roi"]
+
+
+class HoldingSerializer(serializers.ModelSerializer):
+
+    symbol = serializers.CharField(source="stock.symbol")
+    last_traded_price = serializers.FloatField(source="stock.last_traded_price", read_only=True)
+    profit_loss = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Holding
+        fields = [
+            "id", "symbol", "quantity", "average_cost",
+            "last_traded_price", "market_value", "profit_loss",
+        ]
+        read_only_fields = ["market_value"]
+
+    def get_profit_loss(self, obj):
+        return obj.market_value - obj.quantity * obj.average_cost
+
+    def validate_symbol(self, value):
+        return value.upper()
+
+    def validate(self, attrs):
+        stock_data = attrs.pop("stock", None)
+        if stock_data is not None:
+            try:
+                attrs["stock"] = Stock.objects.get(symbol=stock_data["symbol"])
+            except Stock.DoesNotExist:
+                raise serializers.ValidationError({"symbol": "Unknown stock symbol"})
+
+            request = self.context.get("request")
+            existing = Holding.objects.filter(user=request.user, stock=attrs["stock"])
+            if self.instance is not None:
+                existing = existing.exclude(pk=self.instance.pk)
+            if existing.exists():
+                raise serializers.ValidationError({"symbol": "You already hold this stock"})
+        return attrs
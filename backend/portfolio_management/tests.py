@@ -1,3 +1,95 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from stocks.models import Stock
+from .models import Holding, Portfolio
+from .utils import revalue_holdings
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PortfolioCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.stock = Stock.objects.create(symbol="NABIL", last_traded_price=500)
+        Holding.objects.create(user=self.user, stock=self.stock, quantity=10, average_cost=400)
+        revalue_holdings(["NABIL"])
+
+    def summary(self):
+        return self.client.get("/api/portfolio/summary/").json()
+
+    def add_entry(self, name="FD"):
+        Portfolio.objects.create(
+            user=self.user, investment_name=name, total_capital=1000, investment_amount=1100,
+            estimated_return_per_year=10, time_period=1,
+        )
+
+    def test_summary_is_cached_until_prices_change(self):
+        self.assertEqual(self.summary()["holdings"]["market_value"], 5000)
+        with self.assertNumQueries(0):
+            self.summary()
+
+        Stock.objects.filter(symbol="NABIL").update(last_traded_price=550)
+        with self.captureOnCommitCallbacks(execute=True):
+            revalue_holdings(["NABIL"])
+
+        self.assertEqual(self.summary()["holdings"]["market_value"], 5500)
+
+    def test_revaluation_invalidates_only_after_commit(self):
+        self.summary()
+        Stock.objects.filter(symbol="NABIL").update(last_traded_price=550)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                revalue_holdings(["NABIL"])
+                # A read racing the uncommitted revaluation may cache the old
+                # valuation; the deferred invalidation still drops it
+                self.assertIsNotNone(cache.get(f"portfolio:summary:{self.user.id}"))
+
+        self.assertIsNone(cache.get(f"portfolio:summary:{self.user.id}"))
+        self.assertEqual(self.summary()["holdings"]["market_value"], 5500)
+
+    def test_allocation_is_cached_until_entries_change(self):
+        self.add_entry("FD")
+        self.assertEqual(self.client.get("/api/portfolio/allocation/").json(), [
+            {"investment_name": "FD", "investment_amount": 1100},
+        ])
+        with self.assertNumQueries(0):
+            self.client.get("/api/portfolio/allocation/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.add_entry("Gold")
+
+        names = [e["investment_name"] for e in self.client.get("/api/portfolio/allocation/").json()]
+        self.assertEqual(names, ["Gold", "FD"])
+        self.assertEqual(self.summary()["total_capital"], 2000 + 4000)
+
+
+class ProjectionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Portfolio.objects.create(
+            user=self.user, investment_name="FD", total_capital=1000, investment_amount=1100,
+            estimated_return_per_year=10, time_period=5,
+        )
+
+    def test_seed_makes_projection_repeatable(self):
+        url = "/api/portfolio/projection/?paths=200&seed=7"
+        first = self.client.get(url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json(), self.client.get(url).json())
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ("seed=-1", "seed=x", "paths=10", "years=0"):
+            response = self.client.get(f"/api/portfolio/projection/?{query}")
+            self.assertEqual(response.status_code, 400, query)
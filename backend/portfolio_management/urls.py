@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PortfolioViewSet
+from .views import PortfolioViewSet, HoldingViewSet
 
 router = DefaultRouter()
 router.register(r'portfolio', PortfolioViewSet, basename='portfolio')
+router.register(r'holdings', HoldingViewSet, basename='holdings')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from stocks.models import Stock
+from .models import Holding, PortfolioValuation
+
+BATCH_SIZE = 1000
+PORTFOLIO_CACHE_TIMEOUT = 60 * 60
+
+
+def summary_cache_key(user_id):
+    return f"portfolio:summary:{user_id}"
+
+
+def allocation_cache_key(user_id):
+    return f"portfolio:allocation:{user_id}"
+
+
+def invalidate_portfolio_cache(user_ids, allocation=True):
+    """Drops cached summary (and allocation) payloads for the given users."""
+    keys = [summary_cache_key(user_id) for user_id in user_ids]
+    if allocation:
+        keys += [allocation_cache_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+
+
+def refresh_valuations(user_ids):
+    """
+    Recomputes PortfolioValuation for the given users (a list or a
+    queryset of ids) with one grouped aggregate and one bulk upsert.
+    """
+    totals = (
+        Holding.objects.filter(user_id__in=user_ids)
+        .values("user_id")
+        .annotate(
+            cost=Sum(F("quantity") * F("average_cost"), output_field=FloatField()),
+            value=Sum("market_value"),
+        )
+        .order_by()
+    )
+
+    rows = {}
+    for row in totals:
+        cost = row["cost"] or 0
+        value = row["value"] or 0
+        profit = value - cost
+        rows[row["user_id"]] = PortfolioValuation(
+            user_id=row["user_id"],
+            total_cost=cost,
+            market_value=value,
+            profit_loss=profit,
+            roi=(profit / cost * 100) if cost > 0 else 0,
+        )
+
+    # Explicit ids may include users whose last holding was just removed;
+    # they drop back to zero. Querysets only ever select current holders.
+    if isinstance(user_ids, (list, set, tuple)):
+        for user_id in user_ids:
+            rows.setdefault(user_id, PortfolioValuation(user_id=user_id))
+
+    PortfolioValuation.objects.bulk_create(
+        rows.values(),
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["total_cost", "market_value", "profit_loss", "roi", "updated_at"],
+    )
+    # Dropped after commit, so a concurrent read cannot re-cache the old rows;
+    # allocation only lists Portfolio entries, so it stays valid
+    user_ids = list(rows)
+    transaction.on_commit(lambda: invalidate_portfolio_cache(user_ids, allocation=False))
+    return user_ids
+
+
+def revalue_holdings(symbols):
+    """
+    Marks every holding in the given symbols to the latest Stock price in a
+    single UPDATE, then refreshes the affected users' valuations.
+    """
+    affected = Holding.objects.filter(stock__symbol__in=symbols)
+    price = Subquery(
+        Stock.objects.filter(pk=OuterRef("stock_id")).values("last_traded_price")[:1]
+    )
+
+    with transaction.atomic():
+        affected.update(market_value=F("quantity") * Coalesce(price, F("average_cost")))
+        return refresh_valuations(affected.values("user_id").distinct())
+
+
+def on_prices_ingested(sender, symbols, **kwargs):
+    revalue_holdings(symbols)
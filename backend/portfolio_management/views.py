@@ -1,16 +1,31 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.core.cache import cache
 from django.db.models import Sum
 
-from .models import Portfolio
-from .serializers import PortfolioSerializer
+from investo_backend.pagination import KeysetPagination
+from .models import Portfolio, Holding, PortfolioValuation
+from .serializers import PortfolioSerializer, HoldingSerializer
+from .projection import build_assets, estimate_return_stats, simulate, summarize
+from .utils import (
+    PORTFOLIO_CACHE_TIMEOUT,
+    allocation_cache_key,
+    refresh_valuations,
+    summary_cache_key,
+)
+
+
+class PortfolioPagination(KeysetPagination):
+    ordering = ("-id",)
 
 
 class PortfolioViewSet(viewsets.ModelViewSet):
 
     serializer_class = PortfolioSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Full list by default; ?page_size=/&cursor= switch to keyset pages
+    pagination_class = PortfolioPagination
 
     def get_queryset(self):
         return Portfolio.objects.filter(user=self.request.user).order_by("-id")
@@ -18,38 +33,137 @@ class PortfolioViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-    # Portfolio summary endpoint
+    # Portfolio summary endpoint (cached per user until a Portfolio/holding change)
     @action(detail=False, methods=['get'])
     def summary(self, request):
 
-        portfolio = Portfolio.objects.filter(user=request.user)
-
-        total_capital = portfolio.aggregate(Sum('total_capital'))['total_capital__sum'] or 0
-        total_value = portfolio.aggregate(Sum('investment_amount'))['investment_amount__sum'] or 0
+        key = summary_cache_key(request.user.id)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        totals = Portfolio.objects.filter(user=request.user).aggregate(
+            total_capital=Sum('total_capital'),
+            total_value=Sum('investment_amount'),
+        )
+        total_capital = totals['total_capital'] or 0
+        total_value = totals['total_value'] or 0
+
+        # Stock holdings are marked to market after every price ingest
+        valuation = PortfolioValuation.objects.filter(user=request.user).first()
+        holdings = {
+            "total_cost": valuation.total_cost if valuation else 0,
+            "market_value": valuation.market_value if valuation else 0,
+            "profit_loss": valuation.profit_loss if valuation else 0,
+            "roi": valuation.roi if valuation else 0,
+            "valued_at": valuation.updated_at if valuation else None,
+        }
+
+        total_capital += holdings["total_cost"]
+        total_value += holdings["market_value"]
 
         profit = total_value - total_capital
 
         roi = (profit / total_capital * 100) if total_capital > 0 else 0
 
-        return Response({
+        data = {
             "total_capital": total_capital,
             "portfolio_value": total_value,
             "profit_loss": profit,
-            "roi": roi
-        })
+            "roi": roi,
+            "holdings": holdings
+        }
+        cache.set(key, data, PORTFOLIO_CACHE_TIMEOUT)
+        return Response(data)
 
-    # Pie chart data endpoint
+    # Pie chart data endpoint (cached per user until a Portfolio change)
     @action(detail=False, methods=['get'])
     def allocation(self, request):
 
-        portfolio = Portfolio.objects.filter(user=request.user)
+        key = allocation_cache_key(request.user.id)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        data = list(
+            Portfolio.objects.filter(user=request.user)
+            .order_by("-id")
+            .values("investment_name", "investment_amount")
+        )
+        cache.set(key, data, PORTFOLIO_CACHE_TIMEOUT)
+        return Response(data)
+
+    # Monte Carlo projection: ?paths=10000&years=10&seed=1
+    @action(detail=False, methods=['get'])
+    def projection(self, request):
+
+        try:
+            paths = int(request.query_params.get("paths", 10000))
+            years = request.query_params.get("years")
+            years = int(years) if years else None
+            seed = request.query_params.get("seed")
+            seed = int(seed) if seed else None
+        except ValueError:
+            return Response({"error": "paths, years and seed must be integers"}, status=400)
+
+        if not 100 <= paths <= 50000 or (years is not None and not 1 <= years <= 50):
+            return Response({"error": "paths must be 100-50000 and years 1-50"}, status=400)
+        if seed is not None and seed < 0:
+            return Response({"error": "seed must not be negative"}, status=400)
+
+        entries = list(
+            Portfolio.objects.filter(user=request.user)
+            .values("investment_name", "investment_amount", "estimated_return_per_year", "time_period")
+        )
+        holdings = list(
+            Holding.objects.filter(user=request.user).values("stock__symbol", "market_value")
+        )
+        if not entries and not holdings:
+            return Response({"error": "Nothing to project"}, status=400)
+
+        # Entries named after a listed symbol also use its stored history
+        stats = estimate_return_stats(
+            {e["investment_name"].upper() for e in entries} | {h["stock__symbol"] for h in holdings}
+        )
+        horizon = years or max([e["time_period"] for e in entries] + [1])
+        horizon = min(max(horizon, 1), 50)
+
+        assets = build_assets(entries, holdings, stats, horizon)
+
+        totals = simulate(
+            [a["value"] for a in assets],
+            [a["drift"] for a in assets],
+            [a["volatility"] for a in assets],
+            [a["years"] for a in assets],
+            horizon,
+            paths,
+            seed=seed,
+        )
+
+        return Response({
+            "paths": paths,
+            "years": list(range(horizon + 1)),
+            **summarize(totals),
+            "assets": [{k: v for k, v in a.items() if k != "drift"} for a in assets],
+        })
+
+
+class HoldingViewSet(viewsets.ModelViewSet):
+
+    serializer_class = HoldingSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return Holding.objects.filter(user=self.request.user).select_related("stock").order_by("-id")
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+        refresh_valuations([self.request.user.id])
 
-        data = [
-            {
-                "investment_name": item.investment_name,
-                "investment_amount": item.investment_amount
-            }
-            for item in portfolio
-        ]
+    def perform_update(self, serializer):
+        serializer.save()
+        refresh_valuations([self.request.user.id])
 
-        return Response(data)
\ No newline at end of file
+    def perform_destroy(self, instance):
+        instance.delete()
+        refresh_valuations([self.request.user.id])
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reminders', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(fields=['user', 'date', 'time', 'id'], name='reminders_r_user_id_c1d81a_idx'),
+        ),
+    ]
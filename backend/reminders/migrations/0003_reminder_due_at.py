@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:10
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_due_at(apps, schema_editor):
+    Reminder = apps.get_model('reminders', 'Reminder')
+    # The old dispatcher only matched the current minute, so pending email
+    # reminders from earlier minutes were missed for good. Retire them instead
+    # of letting the catch-up scan email every historic miss on the first tick;
+    # reminders without email are plain to-dos and keep their state.
+    cutoff = datetime.now().replace(second=0, microsecond=0)
+    batch = []
+    for reminder in Reminder.objects.only('id', 'date', 'time', 'email_notify', 'is_completed').iterator(chunk_size=2000):
+        reminder.due_at = datetime.combine(reminder.date, reminder.time)
+        if reminder.due_at < cutoff and reminder.email_notify and not reminder.is_completed:
+            reminder.is_completed = True
+        batch.append(reminder)
+        if len(batch) >= 2000:
+            Reminder.objects.bulk_update(batch, ['due_at', 'is_completed'])
+            batch = []
+    if batch:
+        Reminder.objects.bulk_update(batch, ['due_at', 'is_completed'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reminders', '0002_reminder_reminders_r_user_id_c1d81a_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='due_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_due_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='reminder',
+            index=models.Index(condition=models.Q(('email_notify', True), ('is_completed', False)), fields=['due_at'], name='reminder_pending_due_idx'),
+        ),
+    ]
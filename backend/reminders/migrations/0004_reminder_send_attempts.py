@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reminders', '0003_reminder_due_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='send_attempts',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reminders', '0004_reminder_send_attempts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminder',
+            name='occurrence',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='recurrence',
+            field=models.CharField(choices=[('none', 'Does not repeat'), ('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('custom', 'Every N days')], default='none', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='recurrence_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reminder',
+            name='recurrence_interval',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
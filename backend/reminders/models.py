@@ -1,7 +1,17 @@
+import calendar
+from datetime import datetime, timedelta
 from django.db import models
 from django.contrib.auth.models import User
 
 class Reminder(models.Model):
+    RECURRENCE_CHOICES = (
+        ("none", "Does not repeat"),
+        ("daily", "Daily"),
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("custom", "Every N days"),
+    )
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="reminders")
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -11,8 +21,85 @@ class Reminder(models.Model):
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Repeats every `recurrence_interval` days/weeks/months from date + time
+    recurrence = models.CharField(max_length=10, choices=RECURRENCE_CHOICES, default="none")
+    recurrence_interval = models.PositiveIntegerField(default=1)
+    recurrence_end = models.DateField(null=True, blank=True)
+    # Index of the next occurrence to send; only that one is ever stored
+    occurrence = models.PositiveIntegerField(default=0, editable=False)
+
+    # Next occurrence (date + time for one-shot reminders) denormalized so
+    # the dispatcher can range-scan an index
+    due_at = models.DateTimeField(null=True, editable=False)
+    # Failed delivery attempts; each failure pushes due_at back (see tasks.py)
+    send_attempts = models.PositiveSmallIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["date", "time"]
+        indexes = [
+            # Keyset pagination seeks on (date, time, id) per user
+            models.Index(fields=["user", "date", "time", "id"]),
+            # Only pending notifications are ever scanned by the dispatcher
+            models.Index(
+                fields=["due_at"],
+                name="reminder_pending_due_idx",
+                condition=models.Q(is_completed=False, email_notify=True),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.due_at = self.occurrence_at(self.occurrence)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "due_at"}
+
+        super().save(*args, **kwargs)
+
+    def occurrence_at(self, n):
+        """Datetime of the n-th occurrence, always counted from the first one."""
+        start = datetime.combine(self.date, self.time)
+        if n == 0 or self.recurrence == "none":
+            return start
+
+        step = max(self.recurrence_interval, 1)
+        if self.recurrence == "monthly":
+            # Anchored on the start day, so the 31st is clamped per month without drifting
+            months = start.month - 1 + n * step
+            year, month = start.year + months // 12, months % 12 + 1
+            day = min(start.day, calendar.monthrange(year, month)[1])
+            return start.replace(year=year, month=month, day=day)
+
+        days = {"daily": 1, "weekly": 7, "custom": 1}[self.recurrence] * step
+        return start + timedelta(days=days * n)
+
+    def next_occurrence_after(self, moment):
+        """
+        Index and datetime of the first occurrence after `moment`, or
+        (None, None) once the series is over. Missed occurrences are skipped.
+        """
+        if self.recurrence == "none":
+            return None, None
+
+        start = datetime.combine(self.date, self.time)
+        n = self.occurrence + 1
+        if moment > start:
+            # Jump close to `moment` arithmetically instead of stepping one by one
+            step = max(self.recurrence_interval, 1)
+            if self.recurrence == "monthly":
+                elapsed = (moment.year - start.year) * 12 + moment.month - start.month
+                n = max(n, elapsed // step - 1)
+            else:
+                days = {"daily": 1, "weekly": 7, "custom": 1}[self.recurrence] * step
+                n = max(n, (moment - start).days // days - 1)
+
+        while self.occurrence_at(n) <= moment:
+            n += 1
+
+        due = self.occurrence_at(n)
+        if self.recurrence_end and due.date() > self.recurrence_end:
+            return None, None
+        return n, due
 
     def __str__(self):
         return f"{self.title} - {self.user.username}"
@@ -6,7 +6,25 @@ class ReminderSerializer(serializers.ModelSerializer):
     time = serializers.TimeField(format='%H:%M', input_formats=['%H:%M', '%H:%M:%S'])
     date = serializers.DateField(format='%Y-%m-%d', input_formats=['%Y-%m-%d'])
 
+    recurrence_end = serializers.DateField(format='%Y-%m-%d', input_formats=['%Y-%m-%d'], required=False, allow_null=True)
+    next_occurrence = serializers.DateTimeField(source='due_at', format='%Y-%m-%d %H:%M', read_only=True)
+
     class Meta:
         model = Reminder
-        fields = ['id', 'title', 'description', 'date', 'time', 'email_notify', 'is_completed']
-        read_only_fields = ['is_completed']
\ No newline at end of file
+        fields = [
+            'id', 'title', 'description', 'date', 'time', 'email_notify', 'is_completed',
+            'recurrence', 'recurrence_interval', 'recurrence_end', 'next_occurrence',
+        ]
+        read_only_fields = ['is_completed']
+
+    def validate_recurrence_interval(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Interval must be at least 1")
+        return value
+
+    def validate(self, attrs):
+        start = attrs.get('date', getattr(self.instance, 'date', None))
+        end = attrs.get('recurrence_end', getattr(self.instance, 'recurrence_end', None))
+        if start and end and end < start:
+            raise serializers.ValidationError({'recurrence_end': "Must not be before the reminder date"})
+        return attrs
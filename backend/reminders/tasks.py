@@ -1,47 +1,133 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
 from django.conf import settings
+from django.db import transaction
 from .models import Reminder
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Reminders claimed per transaction; a tick keeps claiming until caught up
+CLAIM_BATCH_SIZE = 200
+
+# A failed email is retried after 1, 2, 4, 8 ... minutes, then given up
+MAX_SEND_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(minutes=1)
+
 @shared_task
 def send_reminder_emails():
     # Since USE_TZ = False, datetime.now() gives local server time
     now = datetime.now()
-    current_date = now.date()
-    
-    logger.info(f"--- SCANNING DB: {current_date} at {now.hour:02d}:{now.minute:02d} ---")
-
-    # Filter for exact date and time (matching hour/minute)
-    reminders = Reminder.objects.filter(
-        date=current_date,
-        time__hour=now.hour,
-        time__minute=now.minute,
-        email_notify=True,
-        is_completed=False
+
+    logger.info(f"--- SCANNING DB: due up to {now:%Y-%m-%d %H:%M} ---")
+
+    total = 0
+    while True:
+        claimed = send_due_batch(now)
+        total += claimed
+        if claimed < CLAIM_BATCH_SIZE:
+            break
+
+    if total:
+        logger.info(f"MATCH FOUND: Processed {total} reminders.")
+    return total
+
+
+def build_message(r):
+    # Fallback to username if email field is empty in auth_user
+    recipient = r.user.email or r.user.username
+
+    return EmailMessage(
+        subject=f"⏰ Investo Reminder: {r.title}",
+        body=f"Hi {r.user.first_name or r.user.username},\n\nIt's time for: {r.title}\n{r.description}\n\nBest, Investo Team",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient],
+    )
+
+
+def deliver(messages):
+    """
+    Sends messages over one reused connection and returns a success flag per
+    message. A broken connection is reopened so later messages still go out.
+    """
+    results = []
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        for message in messages:
+            try:
+                results.append(connection.send_messages([message]) == 1)
+            except Exception as e:
+                logger.error(f"MAIL ERROR: {message.to[0]}: {e}")
+                results.append(False)
+                try:
+                    connection.close()
+                    connection.open()
+                except Exception:
+                    pass
+    except Exception as e:
+        # Could not connect at all; the rest of the batch is retried later
+        logger.error(f"MAIL ERROR: {e}")
+        results += [False] * (len(messages) - len(results))
+    finally:
+        connection.close()
+    return results
+
+
+def send_due_batch(now):
+    """
+    Claims one batch of pending reminders due at or before `now` and sends them.
+    Anything missed while beat or the workers were down is simply still due;
+    skip_locked lets several workers share the backlog without double-sending.
+    Returns the number of reminders claimed.
+    """
+    with transaction.atomic():
+        reminders = list(
+            Reminder.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("user")
+            .filter(due_at__lte=now, email_notify=True, is_completed=False)
+            .order_by("due_at")[:CLAIM_BATCH_SIZE]
+        )
+        if not reminders:
+            return 0
+
+        results = deliver([build_message(r) for r in reminders])
+
+        done, retry, advanced = [], [], []
+        for r, ok in zip(reminders, results):
+            if ok:
+                # Recurring reminders move on to their next occurrence instead
+                occurrence, due = r.next_occurrence_after(now)
+                if occurrence is None:
+                    done.append(r.id)
+                else:
+                    r.occurrence, r.due_at, r.send_attempts = occurrence, due, 0
+                    advanced.append(r)
+                continue
+            r.send_attempts += 1
+            if r.send_attempts >= MAX_SEND_ATTEMPTS:
+                logger.error(f"GIVING UP: reminder {r.id} after {r.send_attempts} attempts")
+                # Only this occurrence is dropped; a recurring series carries on
+                occurrence, due = r.next_occurrence_after(now)
+                if occurrence is None:
+                    done.append(r.id)
+                else:
+                    r.occurrence, r.due_at, r.send_attempts = occurrence, due, 0
+                    advanced.append(r)
+            else:
+                r.due_at = now + RETRY_BASE_DELAY * 2 ** (r.send_attempts - 1)
+                retry.append(r)
+
+        Reminder.objects.filter(id__in=done).update(is_completed=True)
+        if retry:
+            Reminder.objects.bulk_update(retry, ["send_attempts", "due_at"])
+        if advanced:
+            Reminder.objects.bulk_update(advanced, ["occurrence", "send_attempts", "due_at"])
+
+    sent = sum(results)
+    logger.info(
+        f"BATCH DONE: {len(reminders)} claimed, {sent} sent, {len(reminders) - sent} failed "
+        f"({len(retry)} to retry), {len(advanced)} advanced, {len(done)} completed"
     )
-    
-    if reminders.exists():
-        logger.info(f"MATCH FOUND: Found {reminders.count()} reminders.")
-
-    for r in reminders:
-        try:
-            # Fallback to username if email field is empty in auth_user
-            recipient = r.user.email or r.user.username
-            
-            send_mail(
-                subject=f"⏰ Investo Reminder: {r.title}",
-                message=f"Hi {r.user.first_name or r.user.username},\n\nIt's time for: {r.title}\n{r.description}\n\nBest, Investo Team",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[recipient],
-                fail_silently=False,
-            )
-            
-            r.is_completed = True 
-            r.save()
-            logger.info(f"SUCCESS: Email sent to {recipient}")
-        except Exception as e:
-            logger.error(f"MAIL ERROR: {e}")
\ No newline at end of file
+    return len(reminders)
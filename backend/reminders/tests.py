@@ -1,3 +1,223 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import tasks
+from .models import Reminder
+
+
+@override_settings(EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend")
+class SendDueBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw")
+        self.now = datetime(2025, 3, 10, 9, 30)
+
+    def make_reminders(self, count, **kwargs):
+        Reminder.objects.bulk_create(
+            Reminder(
+                user=self.user, title=f"r{i}", date=date(2025, 3, 10), time=time(9, 0),
+                due_at=datetime(2025, 3, 10, 9, 0), **kwargs,
+            )
+            for i in range(count)
+        )
+
+    def test_catches_up_on_thousands_of_due_reminders(self):
+        self.make_reminders(3000)
+
+        claimed = []
+        while (n := tasks.send_due_batch(self.now)):
+            claimed.append(n)
+
+        self.assertEqual(claimed[0], tasks.CLAIM_BATCH_SIZE)
+        self.assertEqual(sum(claimed), 3000)
+        self.assertEqual(len(mail.outbox), 3000)
+        self.assertFalse(Reminder.objects.filter(is_completed=False).exists())
+
+    def test_skips_reminders_not_yet_due(self):
+        self.make_reminders(3)
+        Reminder.objects.create(user=self.user, title="later", date=date(2025, 3, 10), time=time(10, 0))
+
+        self.assertEqual(tasks.send_due_batch(self.now), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(Reminder.objects.get(title="later").is_completed)
+
+    def test_failed_sends_back_off_then_give_up(self):
+        self.make_reminders(250)
+        now = self.now
+
+        with mock.patch.object(tasks, "deliver", side_effect=lambda messages: [False] * len(messages)):
+            for attempt in range(1, tasks.MAX_SEND_ATTEMPTS):
+                while tasks.send_due_batch(now):
+                    pass
+                expected_due = now + tasks.RETRY_BASE_DELAY * 2 ** (attempt - 1)
+                self.assertEqual(
+                    set(Reminder.objects.values_list("send_attempts", "due_at", "is_completed")),
+                    {(attempt, expected_due, False)},
+                )
+                # Nothing is retried before its backoff has elapsed
+                self.assertEqual(tasks.send_due_batch(expected_due - timedelta(seconds=1)), 0)
+                now = expected_due
+
+            while tasks.send_due_batch(now):
+                pass
+
+        self.assertEqual(Reminder.objects.filter(is_completed=True).count(), 250)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_summary_counts_each_outcome(self):
+        self.make_reminders(3)
+        Reminder.objects.bulk_create([Reminder(
+            user=self.user, title="weekly", date=date(2025, 3, 10), time=time(8, 0),
+            recurrence="weekly", due_at=datetime(2025, 3, 10, 8, 0),
+        )])
+
+        # Claimed oldest first: the weekly reminder, then the three one-offs
+        with mock.patch.object(tasks, "deliver", return_value=[True, True, False, True]):
+            with self.assertLogs(tasks.logger, "INFO") as logs:
+                tasks.send_due_batch(self.now)
+
+        self.assertIn(
+            "4 claimed, 3 sent, 1 failed (1 to retry), 1 advanced, 2 completed", logs.output[-1],
+        )
+
+    def test_exhausted_retries_skip_to_the_next_weekly_occurrence(self):
+        reminder = Reminder.objects.create(
+            user=self.user, title="weekly", date=date(2025, 3, 10), time=time(9, 0), recurrence="weekly",
+        )
+        now = self.now
+
+        with mock.patch.object(tasks, "deliver", side_effect=lambda messages: [False] * len(messages)):
+            for attempt in range(tasks.MAX_SEND_ATTEMPTS):
+                self.assertEqual(tasks.send_due_batch(now), 1)
+                reminder.refresh_from_db()
+                now = reminder.due_at
+
+        self.assertFalse(reminder.is_completed)
+        self.assertEqual((reminder.occurrence, reminder.send_attempts), (1, 0))
+        self.assertEqual(reminder.due_at, datetime(2025, 3, 17, 9, 0))
+
+        self.assertEqual(tasks.send_due_batch(reminder.due_at), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_retry_succeeds_after_failure(self):
+        self.make_reminders(2)
+
+        with mock.patch.object(tasks, "deliver", return_value=[False, True]):
+            tasks.send_due_batch(self.now)
+        self.assertEqual(Reminder.objects.filter(is_completed=True).count(), 1)
+
+        retry_at = self.now + tasks.RETRY_BASE_DELAY
+        self.assertEqual(tasks.send_due_batch(retry_at), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Reminder.objects.filter(is_completed=False).exists())
+
+
+class OccurrenceTests(TestCase):
+    def reminder(self, start, recurrence, interval=1, **kwargs):
+        return Reminder(
+            date=start.date(), time=start.time(), recurrence=recurrence,
+            recurrence_interval=interval, **kwargs,
+        )
+
+    def test_monthly_clamps_to_month_end_without_drifting(self):
+        r = self.reminder(datetime(2024, 1, 31, 8, 0), "monthly")
+
+        self.assertEqual(
+            [r.occurrence_at(n).date() for n in range(5)],
+            [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31), date(2024, 4, 30), date(2024, 5, 31)],
+        )
+        self.assertEqual(r.occurrence_at(13).date(), date(2025, 2, 28))
+
+    def test_monthly_interval_rolls_over_the_year(self):
+        r = self.reminder(datetime(2024, 11, 30, 8, 0), "monthly", interval=3)
+
+        self.assertEqual(r.occurrence_at(1), datetime(2025, 2, 28, 8, 0))
+        self.assertEqual(r.occurrence_at(2), datetime(2025, 5, 30, 8, 0))
+
+    def test_next_occurrence_skips_missed_ones(self):
+        r = self.reminder(datetime(2025, 1, 1, 9, 0), "daily")
+
+        self.assertEqual(r.next_occurrence_after(datetime(2025, 3, 10, 12, 0)), (69, datetime(2025, 3, 11, 9, 0)))
+        # An occurrence exactly at `moment` counts as already sent
+        self.assertEqual(r.next_occurrence_after(datetime(2025, 3, 11, 9, 0))[1], datetime(2025, 3, 12, 9, 0))
+
+    def test_next_monthly_occurrence_skips_missed_ones(self):
+        r = self.reminder(datetime(2024, 1, 31, 9, 0), "monthly")
+
+        self.assertEqual(r.next_occurrence_after(datetime(2024, 6, 15)), (5, datetime(2024, 6, 30, 9, 0)))
+        self.assertEqual(r.next_occurrence_after(datetime(2024, 6, 30, 9, 0)), (6, datetime(2024, 7, 31, 9, 0)))
+
+    def test_next_occurrence_is_never_behind_the_current_one(self):
+        r = self.reminder(datetime(2025, 1, 1, 9, 0), "weekly", occurrence=10)
+
+        self.assertEqual(r.next_occurrence_after(datetime(2025, 1, 2)), (11, datetime(2025, 3, 19, 9, 0)))
+
+    def test_series_ends_after_recurrence_end(self):
+        r = self.reminder(datetime(2025, 1, 1, 9, 0), "weekly", recurrence_end=date(2025, 1, 20))
+
+        self.assertEqual(r.next_occurrence_after(datetime(2025, 1, 10)), (2, datetime(2025, 1, 15, 9, 0)))
+        self.assertEqual(r.next_occurrence_after(datetime(2025, 1, 15, 9, 0)), (None, None))
+        self.assertEqual(self.reminder(datetime(2025, 1, 1, 9, 0), "none").next_occurrence_after(datetime(2024, 1, 1)), (None, None))
+
+
+class ReminderUpdateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.now = datetime.now().replace(second=0, microsecond=0)
+        self.start = self.now - timedelta(days=10)
+
+    def put(self, reminder, **data):
+        return self.client.put(f"/api/reminders/{reminder.id}/", data, format="json")
+
+    def make_series(self, **kwargs):
+        reminder = Reminder(
+            user=self.user, title="rent", date=self.start.date(), time=self.start.time(),
+            recurrence="daily", **kwargs,
+        )
+        reminder.occurrence, _ = reminder.next_occurrence_after(self.now)
+        reminder.send_attempts = 2
+        reminder.save()
+        return reminder
+
+    def test_unchanged_schedule_keeps_the_series_position(self):
+        reminder = self.make_series()
+        due_at = reminder.due_at
+
+        response = self.put(
+            reminder, title="pay rent", date=f"{self.start:%Y-%m-%d}", time=f"{self.start:%H:%M}", recurrence="daily",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        reminder.refresh_from_db()
+        self.assertEqual((reminder.title, reminder.date), ("pay rent", self.start.date()))
+        self.assertEqual((reminder.due_at, reminder.send_attempts), (due_at, 2))
+
+    def test_changed_schedule_restarts_at_the_next_upcoming_occurrence(self):
+        reminder = self.make_series()
+        new_time = (self.start + timedelta(minutes=1)).time()
+
+        response = self.put(reminder, date=f"{self.start:%Y-%m-%d}", time=f"{new_time:%H:%M}")
+
+        self.assertEqual(response.status_code, 200)
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.date, self.start.date())
+        self.assertEqual(reminder.due_at.time(), new_time)
+        self.assertGreater(reminder.due_at, self.now)
+        self.assertLessEqual(reminder.due_at - self.now, timedelta(days=1))
+        self.assertEqual(reminder.send_attempts, 0)
+
+    def test_changed_past_date_moves_to_today(self):
+        reminder = Reminder.objects.create(
+            user=self.user, title="call", date=self.now.date() + timedelta(days=3), time=time(9, 0),
+        )
+
+        self.put(reminder, date=f"{self.start:%Y-%m-%d}")
+
+        reminder.refresh_from_db()
+        self.assertEqual(reminder.date, self.now.date())
@@ -3,17 +3,46 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
+from django.utils.dateparse import parse_date
 from datetime import datetime
+from investo_backend.pagination import KeysetPagination
 from .models import Reminder
 from .serializers import ReminderSerializer
 
+
+class ReminderPagination(KeysetPagination):
+    ordering = ("date", "time", "id")
+
+
 class ReminderListCreate(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         reminders = Reminder.objects.filter(user=request.user)
-        serializer = ReminderSerializer(reminders, many=True)
-        return Response(serializer.data)
+
+        # Optional filters: ?from=&to= (YYYY-MM-DD, inclusive) and ?completed=true|false
+        for param, lookup in (("from", "date__gte"), ("to", "date__lte")):
+            raw = request.query_params.get(param)
+            if not raw:
+                continue
+            try:
+                day = parse_date(raw)
+            except ValueError:
+                day = None
+            if day is None:
+                return Response({param: "Invalid date, use YYYY-MM-DD"}, status=400)
+            reminders = reminders.filter(**{lookup: day})
+
+        completed = request.query_params.get("completed")
+        if completed in ("true", "false"):
+            reminders = reminders.filter(is_completed=(completed == "true"))
+
+        # Keyset pages when ?page_size= or ?cursor= is given, full list otherwise
+        paginator = ReminderPagination()
+        page = paginator.paginate_queryset(reminders, request, view=self)
+        if page is None:
+            return Response(ReminderSerializer(reminders, many=True).data)
+        return paginator.get_paginated_response(ReminderSerializer(page, many=True).data)
 
     def post(self, request):
         serializer = ReminderSerializer(data=request.data)
@@ -56,11 +85,36 @@ class ReminderDetail(APIView):
 
         serializer = ReminderSerializer(reminder, data=request.data, partial=True)
         if serializer.is_valid():
-            # Apply same logic for updates if date is provided
-            new_date = serializer.validated_data.get('date', reminder.date)
-            if new_date < datetime.now().date():
-                new_date = datetime.now().date()
-                
+            data = serializer.validated_data
+            now = datetime.now()
+
+            # Apply same logic for updates, but only when the date actually changes;
+            # the calendar resends the unchanged date and time on every edit
+            new_date = data.get('date', reminder.date)
+            if new_date != reminder.date and new_date < now.date():
+                new_date = now.date()
+
+            # A changed schedule restarts the series at its next upcoming occurrence
+            schedule = {
+                'date': new_date,
+                'time': data.get('time', reminder.time),
+                'recurrence': data.get('recurrence', reminder.recurrence),
+                'recurrence_interval': data.get('recurrence_interval', reminder.recurrence_interval),
+            }
+            if any(getattr(reminder, f) != value for f, value in schedule.items()):
+                for f, value in schedule.items():
+                    setattr(reminder, f, value)
+                reminder.recurrence_end = data.get('recurrence_end', reminder.recurrence_end)
+                reminder.occurrence = 0
+                reminder.send_attempts = 0
+                if reminder.recurrence != 'none' and reminder.occurrence_at(0) < now:
+                    occurrence, _ = reminder.next_occurrence_after(now)
+                    if occurrence is None:
+                        # Every occurrence of the new schedule is already behind us
+                        reminder.is_completed = True
+                    else:
+                        reminder.occurrence = occurrence
+
             updated_reminder = serializer.save(date=new_date)
             return Response(ReminderSerializer(updated_reminder).data)
         return Response(serializer.errors, status=400)
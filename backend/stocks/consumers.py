@@ -0,0 +1,82 @@
+import json
+from urllib.parse import parse_qs
+from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+from .models import Stock, Watchlist
+from .utils import MARKET_GROUP
+
+
+class MarketConsumer(AsyncWebsocketConsumer):
+    """WebSocket consumer pushing compact price deltas after each ingest."""
+
+    async def connect(self):
+        # None means "all symbols"
+        self.symbols = None
+
+        await self.channel_layer.group_add(MARKET_GROUP, self.channel_name)
+        await self.accept()
+
+        # Subscription can be given up front: ?watchlist=1 or ?symbols=NABIL,NICA
+        params = parse_qs(self.scope.get("query_string", b"").decode())
+        if params.get("watchlist"):
+            await self.subscribe(await self.get_watchlist_symbols())
+        elif params.get("symbols"):
+            # Accepts ?symbols=A,B as well as repeated ?symbols=A&symbols=B
+            await self.subscribe([s for value in params["symbols"] for s in value.split(",")])
+        else:
+            await self.subscribe(None)
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(MARKET_GROUP, self.channel_name)
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            return
+        # Valid JSON that is not an object ([] or "x") is ignored like bad JSON
+        if not isinstance(data, dict):
+            return
+
+        action = data.get("action")
+        if action == "subscribe":
+            symbols = data.get("symbols")
+            await self.subscribe(symbols if isinstance(symbols, list) else [])
+        elif action == "watchlist":
+            await self.subscribe(await self.get_watchlist_symbols())
+        elif action == "all":
+            await self.subscribe(None)
+
+    async def subscribe(self, symbols):
+        if symbols is not None:
+            symbols = {s.strip().upper() for s in symbols if isinstance(s, str) and s.strip()}
+        self.symbols = symbols
+
+        # Current prices first, so clients never need to poll /api/stocks/
+        rows = await self.get_prices(symbols)
+        await self.send(text_data=json.dumps({"type": "snapshot", "data": rows}))
+
+    # ── Handler for price deltas broadcast by stocks.utils.broadcast_prices ──
+    async def price_update(self, event):
+        rows = event["data"]
+        if self.symbols is not None:
+            rows = [r for r in rows if r["s"] in self.symbols]
+        if rows:
+            await self.send(text_data=json.dumps({"type": "prices", "data": rows}))
+
+    # ── Database helpers ──
+    @database_sync_to_async
+    def get_watchlist_symbols(self):
+        return list(Watchlist.objects.values_list("symbol", flat=True))
+
+    @database_sync_to_async
+    def get_prices(self, symbols):
+        qs = Stock.objects.all()
+        if symbols is not None:
+            qs = qs.filter(symbol__in=symbols)
+        return [
+            {"s": symbol, "p": price, "c": change}
+            for symbol, price, change in qs.values_list(
+                "symbol", "last_traded_price", "percentage_change"
+            )
+        ]
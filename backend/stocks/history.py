@@ -0,0 +1,136 @@
+from datetime import date, datetime
+from django.core.cache import cache
+from django.db.models import Max
+from .models import PriceHistory
+from .utils import BATCH_SIZE, FETCH_TTLS, get_nepse, safe_fetch_and_store
+
+SYNC_KEY_PREFIX = "nepse:history-synced:"
+BAR_FIELDS = ("date", "open", "high", "low", "close", "volume")
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_bar(symbol, item):
+    """Maps one upstream chart point (short or long keys) to a PriceHistory row."""
+    if not isinstance(item, dict):
+        return None
+
+    if item.get("t") is not None:
+        ts = float(item["t"])
+        # Upstream timestamps are in milliseconds
+        bar_date = datetime.fromtimestamp(ts / 1000 if ts > 1e11 else ts).date()
+    elif item.get("date") or item.get("businessDate"):
+        raw = str(item.get("date") or item.get("businessDate"))[:10]
+        try:
+            bar_date = datetime.strptime(raw, "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    else:
+        return None
+
+    close = _to_float(item.get("c", item.get("close", item.get("closingPrice"))))
+    if close is None:
+        return None
+
+    return PriceHistory(
+        symbol=symbol,
+        date=bar_date,
+        open=_to_float(item.get("o", item.get("open"))),
+        high=_to_float(item.get("h", item.get("high"))),
+        low=_to_float(item.get("l", item.get("low"))),
+        close=close,
+        volume=_to_float(item.get("v", item.get("volume"))),
+    )
+
+
+def get_security_id(symbol):
+    """
+    NEPSE security id for a ticker. The chart endpoint is keyed by id,
+    resolved through the client's security map like get_market_depth does.
+    """
+    nepse = get_nepse()
+    try:
+        nepse._ensure_security_ids()
+    except Exception as e:
+        print(f"API Error: {e}")
+    return (getattr(nepse, "security_id_map", None) or {}).get(symbol.upper())
+
+
+def sync_price_history(symbol):
+    """
+    Appends the days missing from the stored history of one symbol.
+    Upstream only serves a company's full series, so it is fetched at most
+    once per chart TTL and only bars newer than the latest stored one are written.
+    """
+    latest = PriceHistory.objects.filter(symbol=symbol).aggregate(Max("date"))["date__max"]
+    if latest and latest >= date.today():
+        return 0
+
+    sync_key = SYNC_KEY_PREFIX + symbol
+    if not cache.add(sync_key, 1, FETCH_TTLS["get_historical_chart"]):
+        return 0
+
+    security_id = get_security_id(symbol)
+    if security_id is None:
+        cache.delete(sync_key)
+        return 0
+
+    raw = safe_fetch_and_store(get_nepse().get_historical_chart, security_id) or []
+    # Handle cases where API returns a dict instead of a list
+    if isinstance(raw, dict):
+        raw = raw.get("graphData") or raw.get("data") or []
+    if not raw:
+        # Let the next request retry instead of waiting out the TTL
+        cache.delete(sync_key)
+        return 0
+
+    bars = {}
+    for item in raw:
+        bar = _parse_bar(symbol, item)
+        if bar and (latest is None or bar.date > latest):
+            bars[bar.date] = bar
+
+    PriceHistory.objects.bulk_create(bars.values(), batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(bars)
+
+
+def downsample(rows, points):
+    """
+    Buckets consecutive bars so at most `points` remain, keeping OHLC
+    semantics (first open, max high, min low, last close, summed volume).
+    """
+    if not points or len(rows) <= points:
+        return rows
+
+    size = -(-len(rows) // points)
+    sampled = []
+    for i in range(0, len(rows), size):
+        bucket = rows[i:i + size]
+        highs = [r["high"] for r in bucket if r["high"] is not None]
+        lows = [r["low"] for r in bucket if r["low"] is not None]
+        volumes = [r["volume"] for r in bucket if r["volume"] is not None]
+        sampled.append({
+            "date": bucket[-1]["date"],
+            "open": bucket[0]["open"],
+            "high": max(highs) if highs else None,
+            "low": min(lows) if lows else None,
+            "close": bucket[-1]["close"],
+            "volume": sum(volumes) if volumes else None,
+        })
+    return sampled
+
+
+def get_price_range(symbol, start=None, end=None, points=None):
+    """Returns stored bars for a symbol in [start, end] with one index range scan."""
+    qs = PriceHistory.objects.filter(symbol=symbol)
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    rows = list(qs.order_by("date").values(*BAR_FIELDS))
+    return downsample(rows, points)
@@ -0,0 +1,180 @@
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Max
+from .models import PriceHistory
+
+INDICATOR_KEY_PREFIX = "indicator:"
+INDICATOR_CACHE_TIMEOUT = 60 * 60 * 24
+TRADING_DAYS = 252
+
+# Block length for the closed-form EWM; keeps (1 - alpha) ** -BLOCK finite
+_EWM_BLOCK = 256
+
+
+# ── Array helpers ──
+def _nan_head(values, count):
+    values[:min(count, len(values))] = np.nan
+    return values
+
+
+def _rolling_mean(x, window):
+    out = np.full(len(x), np.nan)
+    if window <= len(x):
+        c = np.cumsum(np.insert(x, 0, 0.0))
+        out[window - 1:] = (c[window:] - c[:-window]) / window
+    return out
+
+
+def _rolling_std(x, window):
+    mean = _rolling_mean(x, window)
+    mean_sq = _rolling_mean(x * x, window)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def _ewm(x, alpha):
+    """
+    Exponentially weighted mean seeded with x[0], without a Python loop per
+    point: each block is solved as a weighted cumulative sum.
+    """
+    out = np.empty(len(x))
+    if not len(x):
+        return out
+    decay = 1.0 - alpha
+    prev = x[0]
+    for start in range(0, len(x), _EWM_BLOCK):
+        block = x[start:start + _EWM_BLOCK]
+        k = np.arange(len(block))
+        grow = decay ** -k
+        out[start:start + len(block)] = (decay ** k) * (decay * prev + alpha * np.cumsum(block * grow))
+        prev = out[start + len(block) - 1]
+    return out
+
+
+# ── Indicators (each takes a close-price array and returns arrays) ──
+def sma(close, window=20):
+    return _rolling_mean(close, window)
+
+
+def ema(close, span=20):
+    return _nan_head(_ewm(close, 2.0 / (span + 1)), span - 1)
+
+
+def rsi(close, period=14):
+    delta = np.diff(close, prepend=close[:1])
+    gain = _ewm(np.clip(delta, 0, None), 1.0 / period)
+    loss = _ewm(np.clip(-delta, 0, None), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+    return _nan_head(out, period)
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = _ewm(close, 2.0 / (fast + 1)) - _ewm(close, 2.0 / (slow + 1))
+    signal_line = _ewm(line, 2.0 / (signal + 1))
+    return {
+        "macd": _nan_head(line, slow - 1),
+        "signal": _nan_head(signal_line.copy(), slow + signal - 2),
+        "histogram": _nan_head(line - signal_line, slow + signal - 2),
+    }
+
+
+def bollinger(close, window=20, k=2.0):
+    mid = _rolling_mean(close, window)
+    width = k * _rolling_std(close, window)
+    return {"middle": mid, "upper": mid + width, "lower": mid - width}
+
+
+def volatility(close, window=20):
+    """Annualised rolling standard deviation of log returns."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.diff(np.log(close), prepend=np.nan)
+    out = np.full(len(close), np.nan)
+    out[1:] = _rolling_std(returns[1:], window) * np.sqrt(TRADING_DAYS)
+    return out
+
+
+def drawdown(close):
+    return close / np.maximum.accumulate(close) - 1.0
+
+
+# Indicator name -> (function, default params)
+INDICATORS = {
+    "sma": (sma, {"window": 20}),
+    "ema": (ema, {"span": 20}),
+    "rsi": (rsi, {"period": 14}),
+    "macd": (macd, {"fast": 12, "slow": 26, "signal": 9}),
+    "bollinger": (bollinger, {"window": 20, "k": 2.0}),
+    "volatility": (volatility, {"window": 20}),
+    "drawdown": (drawdown, {}),
+}
+
+
+def _to_json(values, latest):
+    if isinstance(values, dict):
+        return {key: _to_json(v, latest) for key, v in values.items()}
+    if latest:
+        values = values[-1:]
+    # NaN is not valid JSON; the warm-up period is reported as null
+    return [None if np.isnan(v) else round(float(v), 6) for v in values]
+
+
+def compute_series(close, names, params):
+    """Computes the requested indicators for one close-price array."""
+    return {
+        name: INDICATORS[name][0](close, **params[name])
+        for name in names
+    }
+
+
+def compute_indicators(symbols, names, params, latest=False):
+    """
+    Returns {symbol: {"dates": [...], indicator: values}} from stored history.
+    Each (symbol, indicator, params, last-bar date) result is cached, and
+    history is only loaded, in one query, for symbols with a cache miss.
+    """
+    last_dates = dict(
+        PriceHistory.objects.filter(symbol__in=symbols)
+        .values("symbol").annotate(last=Max("date")).values_list("symbol", "last")
+    )
+
+    # Bar dates are cached alongside the indicators under the same scheme
+    fields = list(names) + ["dates"]
+    keys = {
+        (symbol, name): (
+            f"{INDICATOR_KEY_PREFIX}{symbol}:{name}:"
+            f"{sorted(params.get(name, {}).items())}:{last_dates[symbol]}:{int(latest)}"
+        ).replace(" ", "")
+        for symbol in last_dates for name in fields
+    }
+    cached = cache.get_many(keys.values())
+
+    missing = {symbol for (symbol, name), key in keys.items() if key not in cached}
+    history = {}
+    if missing:
+        rows = (
+            PriceHistory.objects.filter(symbol__in=missing)
+            .order_by("symbol", "date").values_list("symbol", "date", "close")
+        )
+        for symbol, day, close in rows:
+            dates, closes = history.setdefault(symbol, ([], []))
+            dates.append(day)
+            closes.append(close)
+
+    results, fresh = {}, {}
+    for symbol in last_dates:
+        if symbol in history:
+            dates, closes = history[symbol]
+            todo = [n for n in names if keys[(symbol, n)] not in cached]
+            computed = compute_series(np.asarray(closes, dtype=float), todo, params)
+            for name, values in computed.items():
+                fresh[keys[(symbol, name)]] = _to_json(values, latest)
+            fresh[keys[(symbol, "dates")]] = [d.isoformat() for d in (dates[-1:] if latest else dates)]
+
+        results[symbol] = {
+            name: fresh.get(keys[(symbol, name)], cached.get(keys[(symbol, name)]))
+            for name in fields
+        }
+
+    if fresh:
+        cache.set_many(fresh, INDICATOR_CACHE_TIMEOUT)
+    return results
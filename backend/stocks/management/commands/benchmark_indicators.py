@@ -0,0 +1,33 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from stocks.indicators import INDICATORS, compute_series
+
+
+class Command(BaseCommand):
+    help = "Times computing every indicator for every listed symbol on synthetic history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--symbols", type=int, default=350)
+        parser.add_argument("--bars", type=int, default=1500)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        returns = rng.normal(0.0003, 0.015, size=(options["symbols"], options["bars"]))
+        series = 100 * np.exp(np.cumsum(returns, axis=1))
+
+        names = list(INDICATORS)
+        params = {name: defaults for name, (_, defaults) in INDICATORS.items()}
+
+        timings = []
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            for close in series:
+                compute_series(close, names, params)
+            timings.append(time.perf_counter() - start)
+
+        self.stdout.write(
+            f"{len(names)} indicators x {options['symbols']} symbols x {options['bars']} bars: "
+            f"best {min(timings) * 1000:.1f} ms, mean {sum(timings) / len(timings) * 1000:.1f} ms"
+        )
@@ -14,4 +14,22 @@ class Watchlist(models.Model):
     added_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return self.symbol
\ No newline at end of file
+        return self.symbol
+
+class PriceHistory(models.Model):
+    """One daily OHLC bar per symbol, filled incrementally from NEPSE."""
+    symbol = models.CharField(max_length=20)
+    date = models.DateField()
+    open = models.FloatField(null=True, blank=True)
+    high = models.FloatField(null=True, blank=True)
+    low = models.FloatField(null=True, blank=True)
+    close = models.FloatField()
+    volume = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["date"]
+        # Also serves as the (symbol, date) index behind chart range scans
+        unique_together = ("symbol", "date")
+
+    def __str__(self):
+        return f"{self.symbol} - {self.date}"
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Sent after ingest_snapshot writes new prices; `symbols` lists the changed ones
+prices_ingested = Signal()
@@ -0,0 +1,18 @@
+from celery import shared_task
+from .utils import FEEDS, publish_feed
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_feed(name):
+    # Scheduled once per feed from investo_backend/celery.py
+    if name not in FEEDS:
+        logger.error(f"UNKNOWN FEED: {name}")
+        return False
+
+    updated = publish_feed(name)
+    if not updated:
+        logger.warning(f"FEED NOT UPDATED: {name}")
+    return updated
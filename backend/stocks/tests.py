@@ -1,3 +1,189 @@
-from django.test import TestCase
+import math
+from unittest import mock
+import numpy as np
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from . import history, indicators, utils
+from .models import PriceHistory, Stock
+from .routing import websocket_urlpatterns
 
-# Create your tests here.
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class FakeNepse:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def get_market_status(self):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return {"isOpen": "OPEN", "call": self.calls}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PublishFeedTests(TestCase):
+    def setUp(self):
+        utils.cache.clear()
+        self.nepse = FakeNepse()
+        patcher = mock.patch.object(utils, "get_nepse", return_value=self.nepse)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_every_tick_reaches_upstream(self):
+        for _ in range(6):
+            utils.publish_feed("status")
+        self.assertEqual(self.nepse.calls, 6)
+        self.assertEqual(utils.read_feed("status")["call"], 6)
+
+    def test_failed_refresh_keeps_last_snapshot(self):
+        utils.publish_feed("status")
+        self.nepse.fail = True
+        utils.publish_feed("status")
+        self.assertEqual(utils.read_feed("status")["call"], 1)
+
+    def test_fresh_entry_is_served_without_upstream_call(self):
+        api_call = self.nepse.get_market_status
+        utils.safe_fetch_and_store(api_call)
+        utils.safe_fetch_and_store(api_call)
+        self.assertEqual(self.nepse.calls, 1)
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class MarketConsumerTests(TransactionTestCase):
+    def setUp(self):
+        Stock.objects.bulk_create([
+            Stock(symbol="NABIL", last_traded_price=500, percentage_change=1.0),
+            Stock(symbol="NICA", last_traded_price=400, percentage_change=-1.0),
+            Stock(symbol="HDL", last_traded_price=900, percentage_change=0.0),
+        ])
+
+    def snapshot_symbols(self, query):
+        async def run():
+            communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/market/?{query}")
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            frame = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return sorted(row["s"] for row in frame["data"])
+        return async_to_sync(run)()
+
+    def test_url_encoded_symbol_list(self):
+        self.assertEqual(self.snapshot_symbols("symbols=NABIL%2CNICA"), ["NABIL", "NICA"])
+
+    def test_repeated_symbol_params(self):
+        self.assertEqual(self.snapshot_symbols("symbols=nabil&symbols=HDL"), ["HDL", "NABIL"])
+
+    def test_non_object_messages_are_ignored(self):
+        async def run():
+            communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/market/")
+            await communicator.connect()
+            await communicator.receive_json_from()
+            for frame in ("[]", '"x"', "42", '{"action": "subscribe", "symbols": "NABIL"}'):
+                await communicator.send_to(text_data=frame)
+            await communicator.send_json_to({"action": "subscribe", "symbols": ["nica", 7, None]})
+            # The socket survived the junk; the first reply is the empty "symbols" snapshot
+            self.assertEqual((await communicator.receive_json_from())["data"], [])
+            frame = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return [row["s"] for row in frame["data"]]
+        self.assertEqual(async_to_sync(run)(), ["NICA"])
+
+
+class FakeChartNepse:
+    def __init__(self):
+        self.security_id_map = {}
+        self.requested = []
+
+    def _ensure_security_ids(self):
+        self.security_id_map = {"NABIL": 131}
+
+    def get_historical_chart(self, security_id):
+        self.requested.append(security_id)
+        return [{"t": 1700000000 + 86400 * i, "c": 100 + i} for i in range(5)]
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PriceHistorySyncTests(TestCase):
+    def setUp(self):
+        history.cache.clear()
+        self.nepse = FakeChartNepse()
+        patcher = mock.patch.object(history, "get_nepse", return_value=self.nepse)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_chart_is_fetched_by_security_id(self):
+        self.assertEqual(history.sync_price_history("NABIL"), 5)
+        self.assertEqual(self.nepse.requested, [131])
+        self.assertEqual(PriceHistory.objects.filter(symbol="NABIL").count(), 5)
+
+    def test_unknown_symbol_is_skipped(self):
+        self.assertEqual(history.sync_price_history("NOPE"), 0)
+        self.assertEqual(self.nepse.requested, [])
+
+
+def reference_ewm(values, alpha):
+    out, prev = [], values[0]
+    for x in values:
+        prev = alpha * x + (1 - alpha) * prev
+        out.append(prev)
+    return np.array(out)
+
+
+class IndicatorTests(SimpleTestCase):
+    def assertSeries(self, actual, expected):
+        np.testing.assert_allclose(actual, np.array(expected, dtype=float), rtol=1e-9, equal_nan=True)
+
+    def test_sma(self):
+        self.assertSeries(indicators.sma(np.array([1.0, 2, 3, 4, 5]), window=3), [np.nan, np.nan, 2, 3, 4])
+        self.assertSeries(indicators.sma(np.array([1.0, 2]), window=3), [np.nan, np.nan])
+
+    def test_ema_is_seeded_with_the_first_close(self):
+        # alpha = 2 / (3 + 1) = 0.5: 1, 1.5, 2.25, 3.125, 4.0625
+        self.assertSeries(indicators.ema(np.array([1.0, 2, 3, 4, 5]), span=3), [np.nan, np.nan, 2.25, 3.125, 4.0625])
+
+    def test_ewm_matches_a_plain_loop_across_blocks(self):
+        close = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, 1000))
+        for alpha in (2 / 21, 1 / 14, 0.9):
+            self.assertSeries(indicators._ewm(close, alpha), reference_ewm(close, alpha))
+
+    def test_rsi(self):
+        # gains 0, .5, .75, .375, .6875 and losses 0, 0, 0, .5, .25 with alpha 1/2
+        self.assertSeries(
+            indicators.rsi(np.array([1.0, 2, 3, 2, 3]), period=2),
+            [np.nan, np.nan, 100, 100 - 100 / 1.75, 100 - 100 / 3.75],
+        )
+
+    def test_macd(self):
+        close = np.linspace(10, 40, 60) + np.sin(np.arange(60))
+        result = indicators.macd(close, fast=3, slow=6, signal=4)
+
+        line = reference_ewm(close, 2 / 4) - reference_ewm(close, 2 / 7)
+        signal = reference_ewm(line, 2 / 5)
+        self.assertSeries(result["macd"][5:], line[5:])
+        self.assertSeries(result["signal"][8:], signal[8:])
+        self.assertSeries(result["histogram"][8:], (line - signal)[8:])
+        self.assertTrue(np.isnan(result["macd"][:5]).all())
+        self.assertTrue(np.isnan(result["signal"][:8]).all())
+
+    def test_bollinger_uses_population_std(self):
+        result = indicators.bollinger(np.array([1.0, 3, 5]), window=2, k=1.0)
+        self.assertSeries(result["middle"], [np.nan, 2, 4])
+        self.assertSeries(result["upper"], [np.nan, 3, 5])
+        self.assertSeries(result["lower"], [np.nan, 1, 3])
+
+    def test_volatility_annualises_log_returns(self):
+        # Log returns 1 and 2 have a standard deviation of 0.5
+        close = np.exp(np.array([0.0, 1, 3]))
+        self.assertSeries(indicators.volatility(close, window=2), [np.nan, np.nan, 0.5 * math.sqrt(252)])
+
+    def test_drawdown(self):
+        self.assertSeries(indicators.drawdown(np.array([10.0, 12, 9, 12, 15])), [0, 0, -0.25, 0, 0])
+
+    def test_warm_up_is_reported_as_null(self):
+        values = indicators.sma(np.array([1.0, 2, 3]), window=2)
+        self.assertEqual(indicators._to_json(values, latest=False), [None, 1.5, 2.5])
+        self.assertEqual(indicators._to_json(values, latest=True), [2.5])
@@ -7,6 +7,7 @@ urlpatterns = [
     path("gainers/", views.gainers),
     path("losers/", views.losers),
     path("chart/", views.chart),
+    path("indicators/", views.indicators),
     path("summary/", views.summary),
     path("sectors/", views.sectors),
     path("news/", views.news),
@@ -0,0 +1,234 @@
+import hashlib
+import time
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.db import transaction
+from nepse_data_api import Nepse
+from .models import Stock, Watchlist
+from .signals import prices_ingested
+
+BATCH_SIZE = 500
+FEED_KEY_PREFIX = "nepse:feed:"
+FETCH_KEY_PREFIX = "nepse:fetch:"
+MARKET_GROUP = "market"
+
+# Seconds an upstream response stays fresh, per Nepse method. Older
+# entries are kept and served if a refresh fails (stale-while-error).
+FETCH_TTLS = {
+    "get_stocks": 15,
+    "get_market_depth": 15,
+    "get_top_gainers": 30,
+    "get_top_losers": 30,
+    "get_market_status": 60,
+    "get_market_summary": 60,
+    "get_sub_indices": 60,
+    "get_floorsheet": 60,
+    "get_company_news": 900,
+    "get_historical_chart": 3600,
+}
+DEFAULT_FETCH_TTL = 60
+
+# Only one worker refreshes an expired key; the lock expires on its own
+# if that worker dies mid-fetch. Others wait up to FETCH_WAIT for it.
+FETCH_LOCK_TIMEOUT = 30
+FETCH_WAIT = 5
+FETCH_POLL_INTERVAL = 0.1
+
+# Feed name -> (Nepse method, kwargs). Each feed is refreshed by the
+# stocks.tasks.refresh_feed beat task on its own cadence (see celery.py).
+FEEDS = {
+    "stocks": ("get_stocks", {}),
+    "status": ("get_market_status", {}),
+    "gainers": ("get_top_gainers", {"limit": 5}),
+    "losers": ("get_top_losers", {"limit": 5}),
+    "summary": ("get_market_summary", {}),
+    "sectors": ("get_sub_indices", {}),
+    "news": ("get_company_news", {}),
+    "floorsheet": ("get_floorsheet", {}),
+    # Market depth is per-symbol, so only watched symbols are kept warm
+    "depth": ("get_market_depth", {}),
+}
+
+_nepse = None
+
+
+def get_nepse():
+    """Lazily builds the shared Nepse client (it authenticates on creation)."""
+    global _nepse
+    if _nepse is None:
+        # Responses are cached in the shared Django cache instead of per process
+        _nepse = Nepse(enable_cache=False)
+    return _nepse
+
+
+def _fetch_key(api_call, args, kwargs):
+    name = getattr(api_call, "__name__", repr(api_call))
+    params = hashlib.md5(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+    return f"{FETCH_KEY_PREFIX}{name}:{params}", FETCH_TTLS.get(name, DEFAULT_FETCH_TTL)
+
+
+def safe_fetch_and_store(api_call, *args, **kwargs):
+    """
+    Helper to try API through the shared cache.
+    Fresh entries are served directly, only one worker refreshes an expired
+    entry, and the last good response is returned if the API fails.
+    """
+    return _fetch_through_cache(api_call, args, kwargs)
+
+
+def refresh_and_store(api_call, *args, **kwargs):
+    """
+    Like safe_fetch_and_store, but always calls the API. Used by the beat
+    poller, whose interval would otherwise race the freshness TTL and skip
+    every other refresh. Single-flight locking and stale fallback still apply.
+    """
+    return _fetch_through_cache(api_call, args, kwargs, force=True)
+
+
+def _fetch_through_cache(api_call, args, kwargs, force=False):
+    key, ttl = _fetch_key(api_call, args, kwargs)
+    entry = cache.get(key)
+    if not force and entry and time.time() - entry["fetched_at"] < ttl:
+        return entry["data"]
+
+    lock_key = key + ":lock"
+    if not cache.add(lock_key, 1, FETCH_LOCK_TIMEOUT):
+        # Another worker is refreshing: serve stale data, or wait for it
+        if entry:
+            return entry["data"]
+        deadline = time.monotonic() + FETCH_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(FETCH_POLL_INTERVAL)
+            entry = cache.get(key)
+            if entry:
+                return entry["data"]
+        return None
+
+    try:
+        data = api_call(*args, **kwargs)
+    except Exception as e:
+        print(f"API Error: {e}")
+        data = None
+    finally:
+        cache.delete(lock_key)
+
+    # Nepse returns empty payloads on upstream errors, so treat them as failures
+    if not data:
+        return entry["data"] if entry else data
+
+    cache.set(key, {"data": data, "fetched_at": time.time()}, timeout=None)
+    return data
+
+
+def publish_feed(name):
+    """
+    Fetches one feed from NEPSE and publishes it to the shared cache.
+    A failed fetch leaves the last published snapshot in place.
+    """
+    method, kwargs = FEEDS[name]
+    api_call = getattr(get_nepse(), method)
+
+    if name == "depth":
+        data = {}
+        for symbol in Watchlist.objects.values_list("symbol", flat=True):
+            depth = refresh_and_store(api_call, symbol)
+            if depth:
+                data[symbol] = depth
+    else:
+        data = refresh_and_store(api_call, **kwargs)
+
+    if not data:
+        return False
+
+    if name == "stocks":
+        broadcast_prices(ingest_snapshot(data))
+
+    cache.set(FEED_KEY_PREFIX + name, data, timeout=None)
+    return True
+
+
+def read_feed(name, default=None):
+    """Returns the last snapshot published by the poller for a feed."""
+    data = cache.get(FEED_KEY_PREFIX + name)
+    return default if data is None else data
+
+
+def broadcast_prices(changed):
+    """Pushes changed prices to ws/market/ subscribers as compact deltas."""
+    if not changed:
+        return
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(
+        MARKET_GROUP,
+        {
+            "type": "price_update",
+            "data": [
+                {
+                    "s": row["symbol"],
+                    "p": row["last_traded_price"],
+                    "c": row["percentage_change"],
+                }
+                for row in changed
+            ],
+        },
+    )
+
+
+def ingest_snapshot(live_data):
+    """
+    Writes a NEPSE live-market snapshot to the Stock table in bulk.
+    Only rows whose price or change actually moved are upserted, and the
+    whole write happens in one transaction. Returns the list of changed rows.
+    """
+    incoming = {}
+    for item in live_data:
+        symbol = item.get('symbol')
+        if not symbol:
+            continue
+        incoming[symbol] = (
+            item.get('lastTradedPrice'),
+            item.get('percentageChange') or 0.0,
+        )
+
+    if not incoming:
+        return []
+
+    stored = {
+        symbol: (price, change)
+        for symbol, price, change in Stock.objects.filter(symbol__in=incoming.keys())
+        .values_list('symbol', 'last_traded_price', 'percentage_change')
+    }
+
+    changed = [
+        Stock(symbol=symbol, last_traded_price=price, percentage_change=change)
+        for symbol, (price, change) in incoming.items()
+        if stored.get(symbol) != (price, change)
+    ]
+
+    # Nothing moved since the last snapshot, so skip the write entirely
+    if not changed:
+        return []
+
+    with transaction.atomic():
+        Stock.objects.bulk_create(
+            changed,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['symbol'],
+            update_fields=['last_traded_price', 'percentage_change', 'last_updated'],
+        )
+        # Receivers (e.g. portfolio valuation) run once the prices are committed
+        symbols = [s.symbol for s in changed]
+        transaction.on_commit(lambda: prices_ingested.send(sender=Stock, symbols=symbols))
+
+    return [
+        {
+            'symbol': s.symbol,
+            'last_traded_price': s.last_traded_price,
+            'percentage_change': s.percentage_change,
+        }
+        for s in changed
+    ]
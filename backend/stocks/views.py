@@ -1,31 +1,15 @@
 from django.http import JsonResponse
-from nepse_data_api import Nepse
+from django.utils.dateparse import parse_date
 from .models import Stock, Watchlist
-from datetime import date
+from .history import get_price_range, sync_price_history
+from .indicators import INDICATORS, compute_indicators
+from .utils import read_feed
 
-# Initialize NEPSE with cache
-nepse = Nepse(cache_ttl=60, enable_cache=True)
-
-def safe_fetch_and_store(api_call, *args, **kwargs):
-    """Helper to try API, save results to DB, and return DB data if API fails."""
-    try:
-        return api_call(*args, **kwargs)
-    except Exception as e:
-        print(f"API Error: {e}")
-        return None
+# Market feeds are fetched by the stocks.tasks.refresh_feed poller and
+# published to the shared cache; the views below only read that snapshot.
 
 # 🔹 Main Stocks View
 def stocks(request):
-    live_data = safe_fetch_and_store(nepse.get_stocks)
-    if live_data:
-        for item in live_data:
-            Stock.objects.update_or_create(
-                symbol=item.get('symbol'),
-                defaults={
-                    'last_traded_price': item.get('lastTradedPrice'),
-                    'percentage_change': item.get('percentageChange', 0.0)
-                }
-            )
     db_stocks = list(Stock.objects.all().values('symbol', 'last_traded_price', 'percentage_change'))
     return JsonResponse(db_stocks, safe=False)
 
@@ -45,12 +29,12 @@ def get_watchlist(request):
     return JsonResponse(data, safe=False)
 
 def status(request):
-    data = safe_fetch_and_store(nepse.get_market_status) or {"isOpen": False, "note": "Offline"}
+    data = read_feed("status") or {"isOpen": False, "note": "Offline"}
     return JsonResponse(data, safe=False)
 
 # 🔹 FIXED: Mapping Top Gainers
 def gainers(request):
-    raw_data = safe_fetch_and_store(nepse.get_top_gainers, limit=5) or []
+    raw_data = read_feed("gainers") or []
     standardized = []
     for item in raw_data:
         standardized.append({
@@ -61,7 +45,7 @@ def gainers(request):
 
 # 🔹 FIXED: Mapping Top Losers
 def losers(request):
-    raw_data = safe_fetch_and_store(nepse.get_top_losers, limit=5) or []
+    raw_data = read_feed("losers") or []
     standardized = []
     for item in raw_data:
         standardized.append({
@@ -70,21 +54,60 @@ def losers(request):
         })
     return JsonResponse(standardized, safe=False)
 
-# 🔹 FIXED: Mapping Chart Data
+# 🔹 Chart served from stored daily bars: ?symbol=&from=&to=&points=
 def chart(request):
-    symbol = request.GET.get("symbol", "NABIL")
-    today = date.today().strftime("%Y-%m-%d")
-    raw_chart = safe_fetch_and_store(nepse.get_historical_chart, symbol, start_date="2025-01-01", end_date=today) or []
-    
-    # Handle cases where API returns a dict instead of a list
-    if isinstance(raw_chart, dict):
-        raw_chart = raw_chart.get('graphData') or raw_chart.get('data') or []
-        
-    return JsonResponse(raw_chart, safe=False)
+    symbol = request.GET.get("symbol", "NABIL").upper()
+    start_raw = request.GET.get("from")
+    end_raw = request.GET.get("to")
+    try:
+        start = parse_date(start_raw) if start_raw else None
+        end = parse_date(end_raw) if end_raw else None
+        points = int(request.GET.get("points") or 0)
+    except ValueError:
+        start = end = None
+        points = -1
+    if (start_raw and not start) or (end_raw and not end) or points < 0:
+        return JsonResponse({"error": "Invalid from/to/points"}, status=400)
+
+    sync_price_history(symbol)
+    return JsonResponse(get_price_range(symbol, start, end, points), safe=False)
+
+# 🔹 Indicators over stored history:
+# ?symbols=NABIL,NICA&indicators=sma,rsi&sma_window=50&latest=1
+def indicators(request):
+    symbols = [s.strip().upper() for s in request.GET.get("symbols", "").split(",") if s.strip()]
+    names = [n.strip().lower() for n in request.GET.get("indicators", "").split(",") if n.strip()]
+    names = names or list(INDICATORS)
+    if not symbols:
+        return JsonResponse({"error": "No symbols"}, status=400)
+    unknown = [n for n in names if n not in INDICATORS]
+    if unknown:
+        return JsonResponse({"error": f"Unknown indicators: {', '.join(unknown)}"}, status=400)
+
+    params = {}
+    for name in names:
+        params[name] = {}
+        for key, default in INDICATORS[name][1].items():
+            raw = request.GET.get(f"{name}_{key}")
+            try:
+                value = type(default)(raw) if raw is not None else default
+            except ValueError:
+                value = None
+            # Windows below 2 make the smoothing degenerate
+            if value is None or value < (0 if key == "k" else 2):
+                return JsonResponse({"error": f"Invalid {name}_{key}"}, status=400)
+            params[name][key] = value
+
+    latest = request.GET.get("latest") in ("1", "true")
+    return JsonResponse(compute_indicators(symbols, names, params, latest=latest))
+
+# 🔹 Market depth is kept warm for watchlist symbols only
+def depth(request):
+    symbol = request.GET.get("symbol", "").upper()
+    return JsonResponse(read_feed("depth", {}).get(symbol, {}), safe=False)
 
 # Standard Pass-throughs
-def summary(request): return JsonResponse(safe_fetch_and_store(nepse.get_market_summary) or {}, safe=False)
-def sectors(request): return JsonResponse(safe_fetch_and_store(nepse.get_sub_indices) or [], safe=False)
-def news(request): return JsonResponse(safe_fetch_and_store(nepse.get_company_news) or [], safe=False)
-def depth(request): return JsonResponse(safe_fetch_and_store(nepse.get_market_depth) or {}, safe=False)
-def floorsheet(request): return JsonResponse(safe_fetch_and_store(nepse.get_floorsheet) or [], safe=False)
\ No newline at end of file
+def summary(request): return JsonResponse(read_feed("summary") or {}, safe=False)
+def sectors(request): return JsonResponse(read_feed("sectors") or [], safe=False)
+def news(request): return JsonResponse(read_feed("news") or [], safe=False)
+def floorsheet(request): return JsonResponse(read_feed("floorsheet") or [], safe=False)
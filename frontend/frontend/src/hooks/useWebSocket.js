@@ -1,5 +1,16 @@
 import { useState, useEffect, useRef, useCallback } from "react";
 
+const toChatMessage = (data) => ({
+  id: data.id,
+  content: data.message,
+  sender_name: data.sender,
+  sender: data.sender_id,
+  timestamp: data.timestamp,
+});
+
+// Keeps this connection in the server's presence registry
+const HEARTBEAT_INTERVAL_MS = 30000;
+
 /**
  * Custom hook for managing WebSocket connections to chat groups.
  * Handles connection, reconnection, message sending, and cleanup.
@@ -10,6 +21,7 @@ export default function useWebSocket(groupId) {
   const [events, setEvents] = useState([]);
   const wsRef = useRef(null);
   const reconnectTimeout = useRef(null);
+  const heartbeatInterval = useRef(null);
 
   const connect = useCallback(() => {
     if (!groupId) return;
@@ -27,6 +39,12 @@ export default function useWebSocket(groupId) {
 
     ws.onopen = () => {
       setIsConnected(true);
+      clearInterval(heartbeatInterval.current);
+      heartbeatInterval.current = setInterval(() => {
+        if (ws.readyState === WebSocket.OPEN) {
+          ws.send(JSON.stringify({ type: "heartbeat" }));
+        }
+      }, HEARTBEAT_INTERVAL_MS);
       console.log(`[WS] Connected to group ${groupId}`);
     };
 
@@ -34,16 +52,10 @@ export default function useWebSocket(groupId) {
       const data = JSON.parse(event.data);
 
       if (data.type === "message") {
-        setMessages((prev) => [
-          ...prev,
-          {
-            id: data.id,
-            content: data.message,
-            sender_name: data.sender,
-            sender: data.sender_id,
-            timestamp: data.timestamp,
-          },
-        ]);
+        setMessages((prev) => [...prev, toChatMessage(data)]);
+      } else if (data.type === "messages") {
+        // Buffered mode: several messages arrive in one frame, in order
+        setMessages((prev) => [...prev, ...data.messages.map(toChatMessage)]);
       } else if (data.type === "user_event") {
         setEvents((prev) => [...prev, data]);
       } else if (data.type === "error") {
@@ -53,6 +65,7 @@ export default function useWebSocket(groupId) {
 
     ws.onclose = (e) => {
       setIsConnected(false);
+      clearInterval(heartbeatInterval.current);
       console.log(`[WS] Disconnected from group ${groupId}`);
 
       // Auto-reconnect after 3 seconds (if not intentional close)
@@ -84,6 +97,7 @@ export default function useWebSocket(groupId) {
       if (reconnectTimeout.current) {
         clearTimeout(reconnectTimeout.current);
       }
+      clearInterval(heartbeatInterval.current);
     };
   }, [groupId, connect]);
 
@@ -12,11 +12,14 @@ const Admin = () => {
     const [broadcastMsg, setBroadcastMsg] = useState("");
     const [selectedGroupId, setSelectedGroupId] = useState("");
 
+    // The stats endpoint pages the user table; the summary is the same on every page
+    const [page, setPage] = useState(1);
+
     useEffect(() => {
         const fetchStats = async () => {
             const token = localStorage.getItem("jwt");
             try {
-                const response = await fetch("http://localhost:8000/api/admin-portal/stats/", {
+                const response = await fetch(`http://localhost:8000/api/admin-portal/stats/?page=${page}`, {
                     headers: { 
                         "Authorization": `Bearer ${token}`,
                         "Content-Type": "application/json"
@@ -26,7 +29,19 @@ const Admin = () => {
                 if (!response.ok) throw new Error("Unauthorized");
                 const data = await response.json();
                 setStats(data);
+            } catch (error) {
+                console.error("Failed to fetch admin stats:", error);
+            } finally {
+                setLoading(false);
+            }
+        };
+        fetchStats();
+    }, [page]);
 
+    useEffect(() => {
+        const fetchGroups = async () => {
+            const token = localStorage.getItem("jwt");
+            try {
                 // Fetch community groups for admin
                 const commRes = await fetch("http://localhost:8000/api/community/groups/", {
                     headers: { "Authorization": `Bearer ${token}` }
@@ -37,12 +52,10 @@ const Admin = () => {
                     if (groupsData.length > 0) setSelectedGroupId(groupsData[0].id);
                 }
             } catch (error) {
-                console.error("Failed to fetch admin stats:", error);
-            } finally {
-                setLoading(false);
+                console.error("Failed to fetch community groups:", error);
             }
         };
-        fetchStats();
+        fetchGroups();
     }, []);
 
     const handleCreateAnnouncementGroup = async (e) => {
@@ -150,6 +163,27 @@ const Admin = () => {
                     {(!stats?.users || stats.users.length === 0) && (
                         <p style={{ textAlign: 'center', padding: '40px 20px', color: 'var(--text-muted)' }}>No users found.</p>
                     )}
+                    {(page > 1 || stats?.has_next) && (
+                        <div style={{ display: 'flex', justifyContent: 'flex-end', alignItems: 'center', gap: '12px', marginTop: '20px' }}>
+                            <button
+                                type="button"
+                                style={{ padding: '8px 16px', background: 'var(--accent-dim)', color: 'var(--accent)', border: 'none', borderRadius: '12px', fontWeight: 700, cursor: 'pointer', fontFamily: 'var(--font-heading)' }}
+                                disabled={page <= 1}
+                                onClick={() => setPage(page - 1)}
+                            >
+                                Previous
+                            </button>
+                            <span style={{ color: 'var(--text-muted)', fontSize: '13px' }}>Page {stats?.page || page}</span>
+                            <button
+                                type="button"
+                                style={{ padding: '8px 16px', background: 'var(--accent-dim)', color: 'var(--accent)', border: 'none', borderRadius: '12px', fontWeight: 700, cursor: 'pointer', fontFamily: 'var(--font-heading)' }}
+                                disabled={!stats?.has_next}
+                                onClick={() => setPage(page + 1)}
+                            >
+                                Next
+                            </button>
+                        </div>
+                    )}
                 </div>
 
                 {/* ── Community Management Section ── */}